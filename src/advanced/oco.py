@@ -31,8 +31,8 @@ def oco_order(client, symbol, side, quantity, price, stop_price, stop_limit_pric
             stopLimitTimeForce='GTC'
         )
 
-        logger.info(f"OCO order placed successfully: {oco_order}")
-        return oco_order
+        logger.info(f"OCO order placed successfully: {oco_place}")
+        return oco_place
     
     except Exception as e:
         logger.error(f"OCO order failed: {str(e)}")
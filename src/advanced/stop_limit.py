@@ -11,7 +11,8 @@ def stop_limit_order(client, symbol, side, quantity, price, stop_price, time_in_
             quantity=str(quantity),
             price=str(price),
             stopPrice=str(stop_price),
-            timeInForce=time_in_force   
+            timeInForce=time_in_force,
+            newOrderRespType='RESULT'   # default ACK has no status, which risk tracking needs
         )
 
         logger.info(f"Stop-limit order placed successfully: {order}")
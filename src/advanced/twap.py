@@ -1,10 +1,23 @@
-from binance.enums import *
+import threading
 import time
 from logger import logger
 
+# progress of TWAPs currently executing in this process, keyed by id; read by the dashboard.
+# Writers update entries under running_lock; readers should use running_snapshot().
+running = {}
+running_lock = threading.Lock()
+
+
+def running_snapshot():
+    """Copies of every running TWAP's progress, taken under the lock"""
+    with running_lock:
+        return [dict(p) for p in running.values()]
+
+
 @staticmethod
 def twap_order(client, symbol, side, total_quantity, duration_min, slices=4):
     """Place a TWAP (Tine-Weighted Average Price) order"""
+    progress = None
     try:
         results = []
         if slices < 1:
@@ -15,6 +28,13 @@ def twap_order(client, symbol, side, total_quantity, duration_min, slices=4):
 
         logger.info(f"Starting TWAP: {slices} slice over {duration_min} minutes")
 
+        progress = {
+            'symbol': symbol, 'side': side.upper(), 'quantity': total_quantity, 'slices': slices,
+            'done': 0, 'filled': 0.0, 'interval': interval_seconds, 'next_at': time.time(),
+        }
+        with running_lock:
+            running[id(progress)] = progress
+
         for i in range(slices):
             try:
                 logger.info(f"Execution TWAP slice {i+1}/{slices} - Quantity: {slice_quantity:.6f}")
@@ -26,6 +46,10 @@ def twap_order(client, symbol, side, total_quantity, duration_min, slices=4):
                 )
 
                 results.append(result)
+                with running_lock:
+                    progress['filled'] += float(result.get('executedQty', slice_quantity))
+                    progress['done'] = i + 1
+                    progress['next_at'] = time.time() + interval_seconds
                 logger.info(f"Slice {i+1} completed: Order ID {result.get('orderId')}")
 
                 if i < slices -1:
@@ -34,6 +58,9 @@ def twap_order(client, symbol, side, total_quantity, duration_min, slices=4):
             except Exception as slice_error:
                 logger.error(f"Slice {i+1} failed: {str(slice_error)}")
 
+                with running_lock:
+                    progress['done'] = i + 1
+                    progress['next_at'] = time.time() + interval_seconds
                 if i < slices - 1:
                     time.sleep(interval_seconds)
         
@@ -43,3 +70,7 @@ def twap_order(client, symbol, side, total_quantity, duration_min, slices=4):
     except Exception as e:
         logger.error(f"TWAP order failed: {str(e)}")
         raise
+    finally:
+        if progress is not None:
+            with running_lock:
+                running.pop(id(progress), None)
@@ -0,0 +1,475 @@
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from advanced import twap
+from logger import logger
+from market_store import DAY_MS, MarketDataStore, dataset_name, day_start_ms
+from records import FillTable
+
+QUOTE_ASSETS = ('USDT', 'FDUSD', 'USDC', 'TUSD', 'BUSD', 'BTC', 'ETH', 'BNB')
+BAR_COLUMNS = ['open_time', 'open', 'high', 'low', 'close', 'close_time']
+
+
+class SimulatedOrderError(Exception):
+    """Order rejected by the simulated exchange"""
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """Split BTCUSDT into (BTC, USDT) using the known quote assets"""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise SimulatedOrderError(f"Cannot determine quote asset of {symbol}")
+
+
+def _first(mask: np.ndarray) -> Optional[int]:
+    """Index of the first True in mask, None if there is none"""
+    if not len(mask):
+        return None
+    i = int(mask.argmax())
+    return i if mask[i] else None
+
+
+class VirtualClock:
+    """Stand-in for the time module: sleep() advances simulated time instantly"""
+
+    def __init__(self, now_ms: int) -> None:
+        self.now_ms = now_ms
+        self.listeners: List[Callable[[], None]] = []
+
+    def time(self) -> float:
+        return self.now_ms / 1000
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(int(seconds * 1000))
+
+    def advance(self, ms: int) -> None:
+        self.now_ms += max(ms, 0)
+        for listener in self.listeners:
+            listener()
+
+
+class SimulatedClient:
+    """The subset of binance.Client used by the order modules, backed by stored klines.
+
+    Market orders fill at the open of the bar containing the current
+    virtual time. Resting orders (limit, stop-limit, OCO legs) are checked
+    against the high/low of bars completed since they were last settled,
+    one numpy pass per order rather than one step per bar.
+    """
+
+    def __init__(self, bars: Dict[str, Dict[str, np.ndarray]], clock: VirtualClock,
+                 balances: Dict[str, float], fee_rate: float = 0.001) -> None:
+        self.bars = bars
+        self.clock = clock
+        self.fee_rate = fee_rate
+        self.free = dict(balances)
+        self.locked: Dict[str, float] = {}
+        self.orders: Dict[int, dict] = {}
+        self.trades: List[dict] = []
+        self._resting: List[int] = []
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._oco_ids = itertools.count(1)
+        clock.listeners.append(self.settle)
+
+    # -- market data -------------------------------------------------------
+
+    def _bar_index(self, symbol: str, t_ms: int) -> int:
+        if symbol not in self.bars:
+            raise SimulatedOrderError(f"No data loaded for {symbol}")
+        return int(np.searchsorted(self.bars[symbol]['open_time'], t_ms, side='right')) - 1
+
+    def _price(self, symbol: str) -> float:
+        i = self._bar_index(symbol, self.clock.now_ms)
+        if i < 0:
+            raise SimulatedOrderError(f"No {symbol} data before {self.clock.now_ms}")
+        return float(self.bars[symbol]['open'][i])
+
+    def get_symbol_ticker(self, symbol: Optional[str] = None, **params) -> Any:
+        if symbol is None:
+            return [{'symbol': s, 'price': str(self._price(s))} for s in self.bars]
+        return {'symbol': symbol, 'price': str(self._price(symbol))}
+
+    def get_exchange_info(self) -> dict:
+        symbols = []
+        for symbol in self.bars:
+            base, quote = split_symbol(symbol)
+            symbols.append({'symbol': symbol, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote, 'filters': []})
+        return {'symbols': symbols}
+
+    # -- balances ----------------------------------------------------------
+
+    def _move(self, asset: str, amount: float, locked: bool = False) -> None:
+        book = self.locked if locked else self.free
+        book[asset] = book.get(asset, 0.0) + amount
+
+    def _lock(self, asset: str, amount: float) -> None:
+        if self.free.get(asset, 0.0) + 1e-12 < amount:
+            raise SimulatedOrderError(f"Insufficient {asset} balance: need {amount}, free {self.free.get(asset, 0.0)}")
+        self._move(asset, -amount)
+        self._move(asset, amount, locked=True)
+
+    def _unlock(self, asset: str, amount: float) -> None:
+        self._move(asset, -amount, locked=True)
+        self._move(asset, amount)
+
+    def get_account(self, **params) -> dict:
+        self.settle()
+        assets = set(self.free) | set(self.locked)
+        return {'balances': [
+            {'asset': a, 'free': f"{self.free.get(a, 0.0):.8f}", 'locked': f"{self.locked.get(a, 0.0):.8f}"}
+            for a in sorted(assets)
+        ]}
+
+    # -- order entry -------------------------------------------------------
+
+    def _new_order(self, symbol: str, side: str, order_type: str, quantity: Any, **fields) -> dict:
+        qty = float(quantity)
+        if qty <= 0:
+            raise SimulatedOrderError("Quantity must be positive")
+        if side not in ('BUY', 'SELL'):
+            raise SimulatedOrderError(f"Invalid side {side}")
+
+        base, quote = split_symbol(symbol)
+        order = {
+            'symbol': symbol,
+            'orderId': next(self._order_ids),
+            'orderListId': -1,
+            'side': side,
+            'type': order_type,
+            'origQty': qty,
+            'executedQty': 0.0,
+            'status': 'NEW',
+            'time': self.clock.now_ms,
+            'fills': [],
+            '_base': base,
+            '_quote': quote,
+            '_next_bar': self._bar_index(symbol, self.clock.now_ms) + 1,
+        }
+        order.update(fields)
+        self.orders[order['orderId']] = order
+        return order
+
+    def _fill(self, order: dict, price: float, t_ms: int, reserved: float = 0.0) -> None:
+        qty = order['origQty']
+        notional = qty * price
+        fee = notional * self.fee_rate
+        base, quote = order['_base'], order['_quote']
+
+        if reserved:
+            self._unlock(quote if order['side'] == 'BUY' else base, reserved)
+        if order['side'] == 'BUY':
+            self._move(quote, -notional - fee)
+            self._move(base, qty)
+        else:
+            self._move(base, -qty)
+            self._move(quote, notional - fee)
+
+        trade = {
+            'id': next(self._trade_ids),
+            'orderId': order['orderId'],
+            'symbol': order['symbol'],
+            'isBuyer': order['side'] == 'BUY',
+            'qty': str(qty),
+            'price': str(price),
+            'commission': str(fee),
+            'commissionAsset': quote,
+            'time': t_ms,
+        }
+        self.trades.append(trade)
+        order['executedQty'] = qty
+        order['status'] = 'FILLED'
+        order['updateTime'] = t_ms
+        order['fills'].append({'price': str(price), 'qty': str(qty), 'commission': str(fee),
+                               'commissionAsset': quote, 'tradeId': trade['id']})
+
+    def _response(self, order: dict) -> dict:
+        response = {k: v for k, v in order.items() if not k.startswith('_')}
+        for key in ('origQty', 'executedQty', 'price', 'stopPrice'):
+            if key in response:
+                response[key] = f"{response[key]:.8f}"
+        response['transactTime'] = self.clock.now_ms
+        return response
+
+    def order_market(self, symbol: str, side: str, quantity: Any, **params) -> dict:
+        order = self._new_order(symbol, side, 'MARKET', quantity)
+        price = self._price(symbol)
+        if side == 'BUY':
+            need = order['origQty'] * price * (1 + self.fee_rate)
+            if self.free.get(order['_quote'], 0.0) + 1e-12 < need:
+                order['status'] = 'REJECTED'
+                raise SimulatedOrderError(f"Insufficient {order['_quote']} balance for market buy")
+        elif self.free.get(order['_base'], 0.0) + 1e-12 < order['origQty']:
+            order['status'] = 'REJECTED'
+            raise SimulatedOrderError(f"Insufficient {order['_base']} balance for market sell")
+        self._fill(order, price, self.clock.now_ms)
+        return self._response(order)
+
+    def _rest(self, order: dict, reserve_price: float) -> None:
+        if order['side'] == 'BUY':
+            amount = order['origQty'] * reserve_price * (1 + self.fee_rate)
+            self._lock(order['_quote'], amount)
+        else:
+            amount = order['origQty']
+            self._lock(order['_base'], amount)
+        order['_reserved'] = amount
+        self._resting.append(order['orderId'])
+
+    def order_limit(self, symbol: str, side: str, quantity: Any, price: Any, timeInForce: str = 'GTC', **params) -> dict:
+        order = self._new_order(symbol, side, 'LIMIT', quantity, price=float(price), timeInForce=timeInForce)
+        self._rest(order, order['price'])
+        market = self._price(symbol)
+        if (side == 'BUY' and market <= order['price']) or (side == 'SELL' and market >= order['price']):
+            self._resting.remove(order['orderId'])
+            self._fill(order, market, self.clock.now_ms, order.pop('_reserved'))
+        return self._response(order)
+
+    def order(self, symbol: str, side: str, type: str, quantity: Any, price: Any = None,
+              stopPrice: Any = None, timeInForce: str = 'GTC', **params) -> dict:
+        if type == 'MARKET':
+            return self.order_market(symbol=symbol, side=side, quantity=quantity)
+        if type == 'LIMIT':
+            return self.order_limit(symbol=symbol, side=side, quantity=quantity, price=price, timeInForce=timeInForce)
+        if type != 'STOP_LOSS_LIMIT':
+            raise SimulatedOrderError(f"Unsupported simulated order type {type}")
+
+        order = self._new_order(symbol, side, type, quantity, price=float(price),
+                                stopPrice=float(stopPrice), timeInForce=timeInForce)
+        self._rest(order, order['price'])
+        return self._response(order)
+
+    def order_oco(self, symbol: str, side: str, quantity: Any, price: Any, stopPrice: Any,
+                  stopLimitPrice: Any, **params) -> dict:
+        list_id = next(self._oco_ids)
+        limit_leg = self._new_order(symbol, side, 'LIMIT_MAKER', quantity, price=float(price), orderListId=list_id)
+        stop_leg = self._new_order(symbol, side, 'STOP_LOSS_LIMIT', quantity, price=float(stopLimitPrice),
+                                   stopPrice=float(stopPrice), orderListId=list_id)
+        limit_leg['_sibling'] = stop_leg['orderId']
+        stop_leg['_sibling'] = limit_leg['orderId']
+
+        # one reservation covers both legs; it is held on the limit leg
+        self._rest(limit_leg, max(limit_leg['price'], stop_leg['price']))
+        stop_leg['_reserved'] = 0.0
+        self._resting.append(stop_leg['orderId'])
+        return {
+            'orderListId': list_id,
+            'symbol': symbol,
+            'listOrderStatus': 'EXECUTING',
+            'orderReports': [self._response(limit_leg), self._response(stop_leg)],
+        }
+
+    # -- order management --------------------------------------------------
+
+    def _release(self, order: dict, status: str) -> None:
+        reserved = order.pop('_reserved', 0.0)
+        if reserved:
+            self._unlock(order['_quote'] if order['side'] == 'BUY' else order['_base'], reserved)
+        order['status'] = status
+        if order['orderId'] in self._resting:
+            self._resting.remove(order['orderId'])
+
+    def cancel_order(self, symbol: str, orderId: int, **params) -> dict:
+        order = self.orders.get(orderId)
+        if order is None or order['symbol'] != symbol or order['orderId'] not in self._resting:
+            raise SimulatedOrderError(f"Unknown open order {orderId}")
+        sibling = self.orders.get(order.get('_sibling'))
+        if sibling is not None and sibling['orderId'] in self._resting:
+            # move the shared OCO reservation so it is released with the leg that holds it
+            sibling['_reserved'] = sibling.get('_reserved', 0.0) + order.pop('_reserved', 0.0)
+            self._release(sibling, 'CANCELED')
+        self._release(order, 'CANCELED')
+        return self._response(order)
+
+    def get_open_orders(self, symbol: Optional[str] = None, **params) -> List[dict]:
+        self.settle()
+        return [
+            self._response(self.orders[i]) for i in self._resting
+            if symbol is None or self.orders[i]['symbol'] == symbol
+        ]
+
+    def get_my_trades(self, symbol: str, limit: int = 500, **params) -> List[dict]:
+        self.settle()
+        trades = sorted((t for t in self.trades if t['symbol'] == symbol), key=lambda t: t['time'])
+        return trades[-limit:]
+
+    # -- fill simulation ---------------------------------------------------
+
+    def _trigger_index(self, order: dict, lo: int, hi: int) -> Optional[Tuple[int, float]]:
+        """First completed bar in [lo, hi] where order would fill, with its fill price"""
+        bars = self.bars[order['symbol']]
+        low, high, open_ = bars['low'][lo:hi + 1], bars['high'][lo:hi + 1], bars['open'][lo:hi + 1]
+        buy = order['side'] == 'BUY'
+        start = 0
+
+        price = order['price']
+        if order['type'] == 'STOP_LOSS_LIMIT' and not order.get('_triggered'):
+            stop = order['stopPrice']
+            start = _first(high >= stop if buy else low <= stop)
+            if start is None:
+                return None
+            # the limit is only live once the stop trades: at the stop, or at the open if the bar gapped through it
+            triggered = max(stop, open_[start]) if buy else min(stop, open_[start])
+            if (triggered <= price) if buy else (triggered >= price):
+                return lo + start, float(triggered)
+            if (low[start] <= price) if buy else (high[start] >= price):
+                return lo + start, float(price)
+            start += 1
+            order['_triggered'] = True  # rests as a plain limit from here on
+
+        i = _first(low[start:] <= price if buy else high[start:] >= price)
+        if i is None:
+            return None
+        i += start
+        # a bar that opens through a live limit fills at its open
+        fill_price = min(price, open_[i]) if buy else max(price, open_[i])
+        return lo + i, float(fill_price)
+
+    def settle(self, until_ms: Optional[int] = None) -> None:
+        """Fill resting orders against bars completed before until_ms (default: now)"""
+        if not self._resting:
+            return
+        now = self.clock.now_ms if until_ms is None else until_ms
+
+        hits = []
+        for order_id in list(self._resting):
+            order = self.orders[order_id]
+            bars = self.bars[order['symbol']]
+            hi = int(np.searchsorted(bars['open_time'], now, side='right')) - 1
+            if until_ms is None and hi >= 0 and bars['close_time'][hi] >= now:
+                hi -= 1  # bar still in progress
+            lo = order['_next_bar']
+            if lo > hi:
+                continue
+            hit = self._trigger_index(order, lo, hi)
+            order['_next_bar'] = hi + 1
+            if hit is not None:
+                hits.append((hit[0], order_id, hit[1]))
+
+        for index, order_id, price in sorted(hits):
+            order = self.orders[order_id]
+            if order_id not in self._resting:
+                continue  # OCO sibling already filled
+            self._resting.remove(order_id)
+            sibling = self.orders.get(order.get('_sibling'))
+            reserved = order.pop('_reserved', 0.0)
+            if sibling is not None and sibling['orderId'] in self._resting:
+                reserved += sibling.pop('_reserved', 0.0)
+                self._release(sibling, 'EXPIRED')
+            t_ms = int(self.bars[order['symbol']]['open_time'][index])
+            self._fill(order, price, t_ms, reserved)
+
+
+@contextmanager
+def virtual_time(clock: VirtualClock) -> Iterator[None]:
+    """Point the TWAP module's time at the virtual clock"""
+    real_time = twap.time
+    twap.time = clock
+    try:
+        yield
+    finally:
+        twap.time = real_time
+
+
+@contextmanager
+def quiet_logs(level: int = logging.WARNING) -> Iterator[None]:
+    """Silence per-order INFO logging while replaying"""
+    previous = logger.level
+    logger.setLevel(level)
+    try:
+        yield
+    finally:
+        logger.setLevel(previous)
+
+
+class Backtest:
+    """Replay stored klines through the unmodified order modules.
+
+    strategy is called as strategy(client, clock) and places orders with
+    market_orders, limit_orders, stop_limit, oco and twap exactly as the
+    live bot does; TWAP sleeps advance the virtual clock instead of
+    blocking. When the strategy returns, remaining resting orders are
+    settled against the rest of the data.
+    """
+
+    def __init__(self, symbols: List[str], start: date, end: date, balances: Dict[str, float],
+                 store: Optional[MarketDataStore] = None, interval: str = '1m',
+                 fee_rate: float = 0.001) -> None:
+        self.symbols = symbols
+        self.start_ms = day_start_ms(start)
+        self.end_ms = day_start_ms(end) + DAY_MS
+        self.balances = balances
+        self.store = store or MarketDataStore()
+        self.interval = interval
+        self.fee_rate = fee_rate
+
+    def _load_bars(self) -> Dict[str, Dict[str, np.ndarray]]:
+        dataset = dataset_name('klines', self.interval)
+        bars = {}
+        for symbol in self.symbols:
+            columns = self.store.read(dataset, symbol, self.start_ms, self.end_ms, BAR_COLUMNS)
+            if not len(columns['open_time']):
+                raise ValueError(f"No {dataset} data stored for {symbol} in the backtest range")
+            bars[symbol] = columns
+        return bars
+
+    def run(self, strategy: Callable[[SimulatedClient, VirtualClock], Any]) -> dict:
+        """Run strategy once and return a summary of the outcome"""
+        clock = VirtualClock(self.start_ms)
+        client = SimulatedClient(self._load_bars(), clock, self.balances, self.fee_rate)
+
+        with virtual_time(clock), quiet_logs():
+            strategy(client, clock)
+            client.settle(until_ms=self.end_ms)
+            clock.now_ms = max(clock.now_ms, self.end_ms - 1)
+
+        return self._summary(client)
+
+    def _summary(self, client: SimulatedClient) -> dict:
+        fills = FillTable.from_api(sorted(client.trades, key=lambda t: t['time']))
+        final = {a: client.free.get(a, 0.0) + client.locked.get(a, 0.0) for a in set(client.free) | set(client.locked)}
+
+        def value(balances: Dict[str, float], bar: int) -> float:
+            """Quote value of balances at the given bar (0 = first, -1 = last)"""
+            total = 0.0
+            for asset, amount in balances.items():
+                if asset in QUOTE_ASSETS[:5]:
+                    total += amount
+                    continue
+                symbol = next((s for s in client.bars if split_symbol(s)[0] == asset), None)
+                if symbol is not None:
+                    total += amount * float(client.bars[symbol]['close'][bar])
+            return total
+
+        return {
+            'fills': fills,
+            'orders': len(client.orders),
+            'filled_orders': sum(1 for o in client.orders.values() if o['status'] == 'FILLED'),
+            'fees': float(sum(fills.column('commission'))),
+            'start_value': value(self.balances, 0),
+            'end_value': value(final, -1),
+            'balances': final,
+        }
+
+
+def _run_sweep_case(args) -> Tuple[dict, dict]:
+    backtest, make_strategy, params = args
+    result = backtest.run(make_strategy(**params))
+    result.pop('fills')  # keep results small when sending them back across processes
+    return params, result
+
+
+def sweep(backtest: Backtest, make_strategy: Callable[..., Callable], grid: List[Dict[str, Any]],
+          processes: Optional[int] = None) -> List[Tuple[dict, dict]]:
+    """Run backtest for each parameter set in grid across a process pool.
+
+    make_strategy(**params) is called inside the worker and must return the
+    strategy callable, so make_strategy itself must be picklable (a
+    module-level function or a partial of one).
+    """
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_run_sweep_case, [(backtest, make_strategy, params) for params in grid]))
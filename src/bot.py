@@ -1,37 +1,96 @@
-from binance import Client
-from binance.exceptions import BinanceAPIException
+import math
+import threading
+import time
 from config import Config
 from logger import logger
-from typing import Optional, Any, Tuple
+from typing import Optional, Any, Tuple, Dict
+from records import BalanceRecord, OrderTable, FillTable
+from risk import RiskEngine, RiskLimits
 import limit_orders
 import market_orders
 from advanced import stop_limit, oco, twap
+import startup
+
+# python-binance pulls in aiohttp, websockets and dateparser; defer until first API call
+binance = startup.lazy_import('binance')
+
+# how long a REST ticker price is reused when no streamed price is available
+PRICE_CACHE_SECONDS = 30
+# shared-memory ticks older than this are ignored (e.g. the publisher process died)
+TICK_MAX_AGE_SECONDS = 5
 
 
 class TradingBot:
-    def __init__(self) -> None:
-        """Initialize trading bot with API client"""
+    def __init__(self, config=None, exchange_info: Optional[dict] = None, market_data=None,
+                 validation: str = "sync") -> None:
+        """Initialize trading bot with API client
+
+        config defaults to the process-wide Config. Multi-account workers
+        pass an AccountConfig, the exchange info already downloaded by the
+        parent process and a SharedTickBook to read prices from.
+
+        validation is "sync" (check the account before returning),
+        "async" (check in a background thread) or "skip".
+        """
         try:
-            self.config = Config()
+            with startup.phase("config"):
+                self.config = config or Config()
             logger.info("Configuration loaded")
 
-            creds = self.config.credentials
-            self.client = Client(
-                api_key=creds['api_key'],
-                api_secret=creds['api_secret'],
-                testnet=True
-            )
-
-            # self.client.FUTURES_URL = creds['base_url']
-            # logger.debug(f"API endpoint: {self.client.FUTURES_URL}")
+            self._client = None
+            self._client_lock = threading.Lock()
+            self.market_data = market_data
+            self.order_books = None
+            self.risk = RiskEngine(RiskLimits.from_config(self.config))
+            self._rest_prices = {}
+            self._order_listeners = []
+            self._user_stream = None
+            self._stream_lock = threading.Lock()
+            if exchange_info is not None:
+                self._load_exchange_info(exchange_info)
 
             logger.info("Trading bot initialized successfully")
-            self._validate_connection()
+            if validation == "sync":
+                with startup.phase("connection check"):
+                    self._validate_connection()
+            elif validation == "async":
+                threading.Thread(
+                    target=self._validate_connection_async,
+                    name="connection-check",
+                    daemon=True
+                ).start()
+            elif validation != "skip":
+                raise ValueError(f"Unknown validation mode: {validation}")
 
         except Exception as e:
             logger.critical(f"Initialized failed: {str(e)}")
             raise
 
+    @property
+    def client(self):
+        """Binance API client, created on first use"""
+        with self._client_lock:
+            if self._client is None:
+                with startup.phase("binance client"):
+                    creds = self.config.credentials
+                    self._client = binance.Client(
+                        api_key=creds['api_key'],
+                        api_secret=creds['api_secret'],
+                        testnet=True,
+                        ping=False
+                    )
+
+                    # self._client.FUTURES_URL = creds['base_url']
+                    # logger.debug(f"API endpoint: {self._client.FUTURES_URL}")
+            return self._client
+
+    def _validate_connection_async(self):
+        """Background connection check; failures are logged, not raised"""
+        try:
+            self._validate_connection()
+        except Exception as e:
+            logger.critical(f"Background connection check failed: {str(e)}")
+
     def _validate_connection(self):
         """Verify API connectivity and account status"""
         try:
@@ -48,6 +107,8 @@ class TradingBot:
                 None
             )
 
+            self.risk.seed_holdings({b['asset']: float(b['free']) for b in balance})
+
             if usdt_balance and float(usdt_balance['free']) > 0:
                 logger.info(
                     f"Account balance: {usdt_balance['free']} USDT free | "
@@ -58,7 +119,7 @@ class TradingBot:
 
             logger.info("API connection validated")
 
-        except BinanceAPIException as api_error:
+        except binance.exceptions.BinanceAPIException as api_error:
             logger.error(
                 f"API error {api_error.status_code}: {api_error.message}"
             )
@@ -76,15 +137,10 @@ class TradingBot:
 
             if not hasattr(self, '_valid_symbols'):
                 try:
-                    exchange_info = self.client.get_exchange_info()
-
-                    if 'symbols' not in exchange_info:
-                        logger.error("'symbols' key missing in exchange ingo")
-                        raise RuntimeError("Invalid API response format")
-
-                    self._valid_symbols = {s['symbol'] for s in exchange_info['symbols']}
-                    logger.debug(f"Loaded {len(self._valid_symbols)} valid symbols")
-                except BinanceAPIException as e:
+                    self._load_exchange_info(self.client.get_exchange_info())
+                except RuntimeError:
+                    raise
+                except binance.exceptions.BinanceAPIException as e:
                     logger.error(f"API error loading symbols: {e.status_code} {e.message}")
                     raise RuntimeError("Unable to fetch symbol list")
                 except Exception as e:
@@ -94,7 +150,7 @@ class TradingBot:
             if symbol in self._valid_symbols:
                 return True
 
-            logger.warning(f"Invalid symbol: {symbol}. Valid example: {", ".join(sorted(self._valid_symbols)[:3])}")
+            logger.warning(f"Invalid symbol: {symbol}. Valid example: {', '.join(sorted(self._valid_symbols)[:3])}")
             return False
         except RuntimeError:
             raise
@@ -102,6 +158,263 @@ class TradingBot:
             logger.error(f"Symbol validation error: {str(e)}")
             return False
 
+    def _load_exchange_info(self, exchange_info: dict) -> None:
+        """Cache tradable symbols from an exchange info response"""
+        if 'symbols' not in exchange_info:
+            logger.error("'symbols' key missing in exchange info")
+            raise RuntimeError("Invalid API response format")
+
+        self._symbol_info = {s['symbol']: s for s in exchange_info['symbols']}
+        self._valid_symbols = set(self._symbol_info)
+        self.risk.set_bases({s: info['baseAsset'] for s, info in self._symbol_info.items() if 'baseAsset' in info})
+        logger.debug(f"Loaded {len(self._valid_symbols)} valid symbols")
+
+    def start_order_books(self, symbols: list[str]) -> None:
+        """Maintain local depth books for symbols (used for pre-trade impact checks)"""
+        from order_book import DepthBookManager
+
+        self.order_books = DepthBookManager(self.client, symbols)
+        self.order_books.start()
+        logger.info(f"Local order books started for {', '.join(symbols)}")
+
+    def symbol_info(self) -> Dict[str, dict]:
+        """Exchange info entry per symbol, downloaded on first use"""
+        if not hasattr(self, '_symbol_info'):
+            self._load_exchange_info(self.client.get_exchange_info())
+        return self._symbol_info
+
+    def symbol_filters(self, symbol: str) -> Tuple[float, float, float]:
+        """(step size, min qty, min notional) from symbol's exchange filters; zeros if absent"""
+        step, min_qty, min_notional = 0.0, 0.0, 0.0
+        for f in self.symbol_info().get(symbol, {}).get('filters', []):
+            kind = f.get('filterType')
+            if kind == 'LOT_SIZE':
+                step, min_qty = float(f['stepSize']), float(f['minQty'])
+            elif kind in ('MIN_NOTIONAL', 'NOTIONAL'):
+                min_notional = float(f.get('minNotional', 0))
+        return step, min_qty, min_notional
+
+    def order_book(self, symbol: str):
+        """Local depth book for symbol, or None if not kept or not in sync"""
+        return self.order_books.get(symbol) if self.order_books is not None else None
+
+    def round_quantity(self, symbol: str, quantity: float) -> float:
+        """Round quantity down to the symbol's LOT_SIZE step, if known"""
+        info = getattr(self, '_symbol_info', {}).get(symbol)
+        if not info:
+            return quantity
+        for f in info.get('filters', []):
+            if f.get('filterType') == 'LOT_SIZE':
+                step = float(f['stepSize'])
+                if step > 0:
+                    decimals = max(0, -int(math.floor(math.log10(step))))
+                    return round(math.floor(quantity / step + 1e-9) * step, decimals)
+        return quantity
+
+    def _check_impact(self, symbol: str, side: str, quantity: float, action: Optional[str] = None) -> Tuple[float, int]:
+        """Estimate slippage from the local book and apply the configured action.
+
+        Returns the quantity to send and the number of slices to send it in.
+        Without a synced book or a slippage limit the order passes unchanged.
+        """
+        book = self.order_book(symbol)
+        limit = getattr(self.config, 'max_slippage_bps', None)
+        if book is None:
+            return quantity, 1
+
+        estimate = book.estimate(side, quantity)
+        logger.debug(
+            f"Impact estimate {side} {quantity} {symbol}: avg {estimate.avg_price:.8f}, "
+            f"slippage {estimate.slippage_bps:.1f} bps over {estimate.levels} levels"
+        )
+        if limit is None or (estimate.complete and estimate.slippage_bps <= limit):
+            return quantity, 1
+
+        action = action or self.config.impact_action
+        logger.warning(
+            f"{side} {quantity} {symbol} would walk the book: "
+            f"{estimate.slippage_bps:.1f} bps expected slippage (limit {limit} bps), "
+            f"{estimate.filled_qty} available"
+        )
+        if action == "split":
+            slices = self._split_slices(symbol, side, quantity, book, limit)
+            if slices > 1:
+                slice_qty = self.round_quantity(symbol, quantity / slices)
+                logger.warning(f"Splitting {symbol} order into {slices} slices of {slice_qty}")
+                return slice_qty * slices, slices
+            logger.warning(f"No valid split for {symbol} order, capping instead")
+            action = "cap"
+        if action == "cap":
+            capped = self.round_quantity(symbol, min(quantity, book.max_quantity(side, limit)))
+            _, min_qty, min_notional = self.symbol_filters(symbol)
+            if capped < min_qty or capped * (book.mid() or 0.0) < min_notional:
+                capped = 0.0  # below the exchange minimums, it would only be rejected
+            logger.warning(f"Capping {symbol} order to {capped}")
+            return capped, 1
+        return quantity, 1
+
+    def _split_slices(self, symbol: str, side: str, quantity: float, book, limit: float) -> int:
+        """Slices that keep each one within the slippage limit, at most impact_max_slices.
+
+        Returns 1 when no split works: no depth within the limit, or slices
+        that would fall below the symbol's min qty or min notional.
+        """
+        depth = book.max_quantity(side, limit)
+        if depth <= 0:
+            return 1
+        max_slices = getattr(self.config, 'impact_max_slices', 20)
+        slices = min(math.ceil(quantity / depth), max_slices)
+        if slices < math.ceil(quantity / depth):
+            logger.warning(f"{symbol} order needs {math.ceil(quantity / depth)} slices, limited to {max_slices}")
+
+        _, min_qty, min_notional = self.symbol_filters(symbol)
+        slice_qty = self.round_quantity(symbol, quantity / slices)
+        if slice_qty <= 0 or slice_qty < min_qty or slice_qty * (book.mid() or 0.0) < min_notional:
+            return 1
+        return slices
+
+    def _local_price(self, symbol: str) -> Optional[float]:
+        """Latest price known without a network call: local book, shared market data, cached REST ticker"""
+        book = self.order_book(symbol)
+        if book is not None and book.mid() is not None:
+            return book.mid()
+
+        if self.market_data is not None:
+            tick = self.market_data.read(symbol, max_age=TICK_MAX_AGE_SECONDS)
+            if tick is not None:
+                return tick.mid
+
+        cached = self._rest_prices.get(symbol)
+        if cached and time.monotonic() - cached[1] < PRICE_CACHE_SECONDS:
+            return cached[0]
+        return None
+
+    def _last_price(self, symbol: str) -> float:
+        """Latest local price, falling back to a REST ticker"""
+        price = self._local_price(symbol)
+        if price is not None:
+            return price
+
+        ticker = self.client.get_symbol_ticker(symbol=symbol)
+        price = float(ticker['price'])
+        self._rest_prices[symbol] = (price, time.monotonic())
+        self.risk.on_price(symbol, price)
+        return price
+
+    def cache_prices(self, prices: Dict[str, float]) -> None:
+        """Seed the REST price cache from a bulk ticker call"""
+        now = time.monotonic()
+        for symbol, price in prices.items():
+            self._rest_prices[symbol] = (price, now)
+            self.risk.on_price(symbol, price)
+
+    def _reference_price(self, symbol: str, order_type: str, kwargs: dict) -> Optional[float]:
+        """Price used to value an order for risk checks; never makes a network call"""
+        if order_type == "OCO" and 'price' in kwargs and 'stop_limit_price' in kwargs:
+            return max(float(kwargs['price']), float(kwargs['stop_limit_price']))
+        if order_type in ("LIMIT", "STOP_LIMIT") and 'price' in kwargs:
+            return float(kwargs['price'])
+        price = self._local_price(symbol)
+        return price if price is not None else self.risk.last_price(symbol)
+
+    def _quote_asset(self, symbol: str) -> Optional[str]:
+        info = getattr(self, '_symbol_info', {}).get(symbol)
+        return info.get('quoteAsset') if info else None
+
+    def _record_order(self, symbol: str, side: str, result: Any) -> None:
+        """Feed order acks and immediate fills from a REST response into the risk engine"""
+        if isinstance(result, list):
+            for response in result:
+                self._record_order(symbol, side, response)
+            return
+        if not isinstance(result, dict):
+            return
+
+        if 'orderReports' in result:
+            # both OCO legs share one reservation, keyed by the order list
+            reports = result['orderReports']
+            if reports:
+                self.risk.on_ack(
+                    f"list:{result['orderListId']}", symbol, side,
+                    max(float(r.get('origQty', 0)) for r in reports),
+                    max(float(r.get('price', 0)) for r in reports)
+                )
+            return
+
+        key = result.get('orderId')
+        quote = self._quote_asset(symbol)
+        for fill in result.get('fills', []):
+            commission = float(fill['commission']) if fill.get('commissionAsset') == quote else 0.0
+            self.risk.on_fill(
+                key, symbol, side, float(fill['qty']), float(fill['price']),
+                commission, fill.get('tradeId')
+            )
+
+        if result.get('status') in ('NEW', 'PARTIALLY_FILLED'):
+            remaining = float(result.get('origQty', 0)) - float(result.get('executedQty', 0))
+            price = float(result.get('price') or 0) or self._last_price(symbol)
+            self.risk.on_ack(key, symbol, side, remaining, price)
+
+    def add_order_listener(self, callback) -> None:
+        """Call callback(event) for every user data stream event"""
+        self._order_listeners.append(callback)
+
+    @property
+    def user_stream_active(self) -> bool:
+        """Whether the user data stream has been started"""
+        return self._user_stream is not None
+
+    def start_user_stream(self) -> None:
+        """Stream execution reports so resting orders update the risk engine as they fill"""
+        from binance import ThreadedWebsocketManager
+
+        with self._stream_lock:
+            if self._user_stream is not None:
+                return
+            creds = self.config.credentials
+            stream = ThreadedWebsocketManager(
+                api_key=creds['api_key'],
+                api_secret=creds['api_secret'],
+                testnet=True
+            )
+            stream.start()
+            stream.start_user_socket(callback=self._handle_user_event)
+            self._user_stream = stream
+        logger.info("User data stream started")
+
+    def ensure_user_stream(self) -> bool:
+        """Start the user stream once, logging instead of raising on failure: fills
+        and cancels of resting orders only reach the risk engine through it"""
+        try:
+            self.start_user_stream()
+        except Exception as e:
+            logger.warning(f"Could not start user data stream, resting orders will not update risk state: {str(e)}")
+        return self.user_stream_active
+
+    def _handle_user_event(self, event: dict) -> None:
+        if event.get('e') == 'error':
+            logger.error(f"User data stream error: {event.get('m')}")
+            return
+
+        if event.get('e') == 'executionReport':
+            symbol, exec_type = event['s'], event['x']
+            key = f"list:{event['g']}" if event.get('g', -1) != -1 else event['i']
+            if exec_type == 'TRADE':
+                quote = self._quote_asset(symbol)
+                commission = float(event['n']) if event.get('N') == quote else 0.0
+                self.risk.on_fill(
+                    key, symbol, event['S'], float(event['l']), float(event['L']),
+                    commission, event.get('t')
+                )
+            elif exec_type in ('CANCELED', 'EXPIRED', 'REJECTED', 'TRADE_PREVENTION'):
+                self.risk.on_cancel(key)
+
+        for listener in self._order_listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Order listener failed: {str(e)}")
+
     def place_order(self, symbol, side, order_type, quantity, **kwargs) -> Tuple[bool, Any]:
         """Core order placement method"""
         quantity = float(quantity)
@@ -115,13 +428,37 @@ class TradingBot:
             if quantity <= 0:
                 return False, "Quantity must be positive"
 
+            if self.risk.limits.active and order_type in ("MARKET", "LIMIT", "STOP_LIMIT", "OCO", "TWAP"):
+                reference = self._reference_price(symbol, order_type, kwargs)
+                if reference is None:
+                    logger.warning(f"Risk check rejected {order_type} {side} {quantity} {symbol}: no local price")
+                    return False, (
+                        f"Risk check failed: no local price for {symbol} "
+                        f"(start order books or shared market data for it)"
+                    )
+                resting = order_type in ("LIMIT", "STOP_LIMIT", "OCO")
+                if resting:
+                    self.ensure_user_stream()
+                allowed, reason = self.risk.check(symbol, side, quantity, reference, resting)
+                if not allowed:
+                    logger.warning(f"Risk check rejected {order_type} {side} {quantity} {symbol}: {reason}")
+                    return False, f"Risk check failed: {reason}"
+
             logger.info(f"Placing {order_type} order: {side} {quantity} {symbol}")
             str_kwargs = {k: str(v) for k, v in kwargs.items()}
 
             if order_type == "MARKET":
-                result = market_orders.market_order(
-                    self.client, symbol, side, quantity
-                )
+                quantity, slices = self._check_impact(symbol, side, quantity)
+                if quantity <= 0:
+                    return False, "No tradable quantity within the slippage limit"
+                if slices > 1:
+                    result = twap.twap_order(
+                        self.client, symbol, side, quantity, self.config.impact_split_minutes, slices
+                    )
+                else:
+                    result = market_orders.market_order(
+                        self.client, symbol, side, quantity
+                    )
             elif order_type == "LIMIT":
                 if 'price' not in kwargs:
                     return False, "Price is required for limitorders"
@@ -143,32 +480,18 @@ class TradingBot:
             elif order_type == "TWAP":
                 if 'duration_min' not in kwargs:
                     return False, "Missing 'duration_min' for TWAP order"
-                try:
-                    ticker = self.client.get_symbol_ticker(symbol=symbol)
-                    price = float(ticker['price'])
-
-                    slice_qty = quantity / kwargs.get('slices', 4)
-                    required_total = slice_qty * price
-
-                    balance = self.get_account_balance()
-                    usdt_balance = balance.get('USDT', {}).get('available', 0)
-
-                    if usdt_balance < required_total:
-                        return False, (
-                            f"Insufficient margin. Need ${required_total:.2f}"
-                            f"for smallest slice, available ${usdt_balance:.2f}"
-                        )
-                except Exception as e:
-                    logger.error(f"Margin check failed: {str(e)}")
-                    return False, "Margin verification error"
+                slice_qty = quantity / kwargs.get('slices', 4)
+                # slices are already spread over time, so only warn about their impact
+                self._check_impact(symbol, side, slice_qty, action="warn")
                 result = twap.twap_order(
                     self.client, symbol, side, quantity, kwargs['duration_min'], kwargs.get('slices', 4)
                 )
             else:
                 return False, f"unsupported order type: {order_type}"
 
+            self._record_order(symbol, side, result)
             return True, result
-        except BinanceAPIException as e:
+        except binance.exceptions.BinanceAPIException as e:
             error = f"API Error (code {e.status_code}): {e.message}"
             logger.error(error)
             return False, error
@@ -176,33 +499,28 @@ class TradingBot:
             logger.error(f"Order placement failed: {str(e)}")
             return False, str(e)
 
-    def get_account_balance(self) -> dict:
-        """Get current account balance with available margin"""
+    def get_account_balance(self) -> Dict[str, BalanceRecord]:
+        """Get current non-zero balances keyed by asset"""
         try:
-            account = self.client.get_account()
-            balances = account['balances']
+            account = self.client.get_account(omitZeroBalances='true')
 
             formatted = {}
-            for asset in balances:
-                free = float(asset['free'])
-                locked = float(asset['locked'])
-                total = free + locked
-                if total > 0:
-                    formatted[asset['asset']] = {
-                        'free': free,
-                        'locked': locked,
-                        'total': total
-                    }
+            for asset in account['balances']:
+                record = BalanceRecord.from_api(asset)
+                if record.total > 0:
+                    formatted[record.asset] = record
+            # first balance seen (when the startup check was skipped) seeds holdings for the risk engine
+            self.risk.seed_holdings({asset: float(b.free) for asset, b in formatted.items()})
             logger.info(f"Retrieved balances for {len(formatted)} assets")
             return formatted
-        except BinanceAPIException as e:
+        except binance.exceptions.BinanceAPIException as e:
             logger.error(f"Balance check failed: {e.status_code} {e.message}")
             raise RuntimeError(f"Failed to get balance {e.message}")
         except Exception as e:
             logger.error(f"Unexpected balance error: {str(e)}")
             raise RuntimeError("Failed to get balance")
 
-    def get_open_orders(self, symbol: Optional[str] = None) -> list[dict]:
+    def get_open_orders(self, symbol: Optional[str] = None) -> OrderTable:
         """Get current open orders with detailed information"""
         try:
             if symbol:
@@ -210,49 +528,25 @@ class TradingBot:
             else:
                 orders = self.client.get_open_orders()
 
-            formatted = []
-            for order in orders:
-                formatted.append({
-                    'orderId': order['orderId'],
-                    'symbol': order['symbol'],
-                    'side': order['side'],
-                    'type': order['type'],
-                    'origQty': float(order['origQty']),
-                    'price': float(order.get('price', 0)),
-                    'status': order['status'],
-                    'time': order['time'],
-                })
-
+            formatted = OrderTable.from_api(orders)
             logger.info(f"Retrieved {len(formatted)} open orders")
             return formatted
-        except BinanceAPIException as e:
+        except binance.exceptions.BinanceAPIException as e:
             logger.error(f"Order check failed: {e.status_code} {e.message}")
             raise RuntimeError(f"Failed to get orders: {e.message}")
         except Exception as e:
             logger.error(f"Unexpected order error: {str(e)}")
             raise RuntimeError("Failed to get orders")
 
-    def get_trade_history(self, symbol: str, limit: int = 10) -> list[dict]:
+    def get_trade_history(self, symbol: str, limit: int = 10) -> FillTable:
         """Get recent trades for a symbol"""
         try:
-            trades = self.client.get_my_trades(symbol=symbol)
-            trades = trades[-limit:]
-
-            formatted = []
-            for trade in trades:
-                formatted.append({
-                    'id': trade['id'],
-                    'symbol': trade['symbol'],
-                    'side': trade['isBuyer'] and 'BUY' or 'SELL',
-                    'qty': float(trade['qty']),
-                    'price': float(trade['price']),
-                    'commission': f"{trade['commission']} {trade['commissionAsset']}",
-                    'time': trade['time']
-                })
+            trades = self.client.get_my_trades(symbol=symbol, limit=limit)
 
+            formatted = FillTable.from_api(trades[-limit:])
             logger.info(f"Retrieved {len(formatted)} trades for {symbol}")
             return formatted
-        except BinanceAPIException as e:
+        except binance.exceptions.BinanceAPIException as e:
             logger.error(f"Trade history error: {e.status_code} {e.message}")
             raise RuntimeError(f"Failed to get trade history: {e.message}")
         except Exception as e:
@@ -267,8 +561,10 @@ class TradingBot:
                 orderId=order_id
             )
             logger.info(f"Canceled order {order_id} on {symbol}")
+            list_id = result.get('orderListId', -1) if isinstance(result, dict) else -1
+            self.risk.on_cancel(f"list:{list_id}" if list_id != -1 else order_id)
             return True, result
-        except BinanceAPIException as e:
+        except binance.exceptions.BinanceAPIException as e:
             error = f"Cancel failed: {e.status_code} {e.message}"
             logger.error(error)
             return False, error
@@ -281,13 +577,13 @@ class TradingBot:
         """Calculate maximum position size based on available balance"""
         try:
             balance = self.get_account_balance()
-            usdt_balance = balance.get('USDT', {}).get('free', 0)
+            usdt = balance.get('USDT')
+            usdt_balance = float(usdt.free) if usdt else 0.0
 
             if not usdt_balance:
                 return 0
 
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
-            price = float(ticker['price'])
+            price = self._last_price(symbol)
 
             return (usdt_balance * leverage) / price
         except Exception as e:
@@ -1,38 +1,57 @@
 import os
-from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
-class Config:
-    _instance = None
-    _initialized = False
+def _env_float(name: str) -> Optional[float]:
+    """Optional numeric setting; unset or empty means no limit"""
+    raw = os.getenv(name, "").strip()
+    return float(raw) if raw else None
 
-    def __new__(cls) -> 'Config':
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
 
-    def __init__(self):
-        if not self.__class__._initialized:
-            self.load_env()
-            self.__class__._initialized = True
+def load_trading_settings(config) -> None:
+    """Order-handling settings shared by every account"""
+    # pre-trade market impact check against the local order book
+    config.max_slippage_bps = _env_float("IMPACT_MAX_SLIPPAGE_BPS")
+    config.impact_action = os.getenv("IMPACT_ACTION", "warn").strip().lower()
+    config.impact_split_minutes = _env_float("IMPACT_SPLIT_MINUTES") or 5.0
+    config.impact_max_slices = int(_env_float("IMPACT_MAX_SLICES") or 20)
+
+    # in-memory pre-trade risk limits (notional in quote currency)
+    config.risk_max_order_notional = _env_float("RISK_MAX_ORDER_NOTIONAL")
+    config.risk_max_symbol_notional = _env_float("RISK_MAX_SYMBOL_NOTIONAL")
+    config.risk_max_gross_exposure = _env_float("RISK_MAX_GROSS_EXPOSURE")
+    config.risk_max_daily_loss = _env_float("RISK_MAX_DAILY_LOSS")
+    max_open_orders = _env_float("RISK_MAX_OPEN_ORDERS")
+    config.risk_max_open_orders = int(max_open_orders) if max_open_orders is not None else None
+
+    if config.impact_action not in ("warn", "cap", "split"):
+        raise ValueError(f"IMPACT_ACTION must be warn, cap or split, got '{config.impact_action}'")
+    if config.impact_max_slices < 1:
+        raise ValueError(f"IMPACT_MAX_SLICES must be at least 1, got {config.impact_max_slices}")
+
+
+class _EnvCredentials:
+    """API credentials read from <env_prefix>_API_KEY/_API_SECRET plus the shared trading settings"""
+    env_prefix = "BINANCE_TESTNET"
 
     def load_env(self) -> None:
         """Load enviroment variables from .env file"""
         try:
+            from dotenv import load_dotenv
             load_dotenv()
-            self.api_key = os.getenv("BINANCE_TESTNET_API_KEY")
-            self.api_secret = os.getenv("BINANCE_TESTNET_API_SECRET")
+            self.api_key = os.getenv(f"{self.env_prefix}_API_KEY")
+            self.api_secret = os.getenv(f"{self.env_prefix}_API_SECRET")
 
             if not self.api_key or not self.api_secret:
-                raise ValueError("API credentials not found in .env file.")
+                raise ValueError(f"API credentials ({self.env_prefix}_API_KEY/_API_SECRET) not found in .env file.")
 
             self.base_url = "https://testnet.binance.vision/api"
             self.timeout = 100
+            load_trading_settings(self)
 
         except Exception as e:
             raise RuntimeError(f"Configuration failed: {str(e)}") from e
-    
+
     @property
     def credentials(self) -> Dict[str, Any]:
         """Get alll credentials as a dictionary"""
@@ -41,3 +60,35 @@ class Config:
             "api_secret": self.api_secret,
             "base_url": self.base_url
         }
+
+
+class Config(_EnvCredentials):
+    _instance = None
+    _initialized = False
+
+    def __new__(cls) -> 'Config':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__class__._initialized:
+            self.load_env()
+            self.__class__._initialized = True
+
+
+class AccountConfig(_EnvCredentials):
+    """Credentials for one named account of a multi-account runtime (BINANCE_TESTNET_<NAME>_API_KEY/SECRET)"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.env_prefix = f"BINANCE_TESTNET_{name.upper()}"
+        self.load_env()
+
+
+def account_names() -> List[str]:
+    """Account names listed in BINANCE_ACCOUNTS (comma separated)"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    raw = os.getenv("BINANCE_ACCOUNTS", "")
+    return [name.strip() for name in raw.split(",") if name.strip()]
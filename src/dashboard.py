@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Tuple
+from logger import logger
+from records import BalanceRecord, FillRecord, OrderRecord, to_decimal
+from advanced import twap
+
+CLOSED_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH')
+BALANCE_CELL = 34
+# fixed section heights keep rows in place, so a new fill does not shift (and redraw) the order list
+BALANCE_ROWS = 3
+TWAP_ROWS = 3
+FILL_ROWS = 5
+LOG_ROWS = 3
+
+Line = Tuple[str, int]   # text, curses attribute
+
+
+class DashboardState:
+    """Balances, open orders and recent fills kept current from the user data stream.
+
+    Seeded with one balance and one open-orders REST call; after that every
+    change comes from stream events, so watching it costs no request weight.
+    """
+
+    def __init__(self, bot, max_fills: int = 200) -> None:
+        self.bot = bot
+        self.balances: Dict[str, BalanceRecord] = {}
+        self.orders: Dict[int, OrderRecord] = {}
+        self.fills = deque(maxlen=max_fills)
+        self.version = 0
+        self._closed = set()
+        self._streamed_assets = set()
+        self._sorted: List[OrderRecord] = []
+        self._sorted_version = -1
+        self._lock = threading.Lock()
+        bot.add_order_listener(self.on_event)
+
+    def load(self) -> None:
+        """Initial snapshot; entries the stream already updated are kept"""
+        balances = self.bot.get_account_balance()
+        orders = self.bot.get_open_orders()
+        with self._lock:
+            for asset, balance in balances.items():
+                if asset not in self._streamed_assets:
+                    self.balances[asset] = balance
+            for order in orders:
+                if order.order_id not in self._closed:
+                    self.orders.setdefault(order.order_id, order)
+            self.version += 1
+
+    def on_event(self, event: dict) -> None:
+        kind = event.get('e')
+        if kind == 'outboundAccountPosition':
+            with self._lock:
+                for b in event.get('B', []):
+                    balance = BalanceRecord(b['a'], to_decimal(b['f']), to_decimal(b['l']))
+                    self._streamed_assets.add(b['a'])
+                    if balance.total:
+                        self.balances[b['a']] = balance
+                    else:
+                        self.balances.pop(b['a'], None)
+                self.version += 1
+        elif kind == 'executionReport':
+            self._on_execution(event)
+
+    def _on_execution(self, event: dict) -> None:
+        order_id, status = event['i'], event['X']
+        with self._lock:
+            if event['x'] == 'TRADE':
+                self.fills.append(FillRecord(
+                    trade_id=event['t'], order_id=order_id, symbol=event['s'], side=event['S'],
+                    qty=to_decimal(event['l']), price=to_decimal(event['L']),
+                    commission=to_decimal(event['n']), commission_asset=event.get('N') or '',
+                    time=event['T'],
+                ))
+            if status in CLOSED_STATUSES:
+                self.orders.pop(order_id, None)
+                self._closed.add(order_id)
+            else:
+                self.orders[order_id] = OrderRecord(
+                    order_id=order_id, symbol=event['s'], side=event['S'], type=event['o'],
+                    orig_qty=to_decimal(event['q']), executed_qty=to_decimal(event['z']),
+                    price=to_decimal(event['p']), status=status, time=event.get('O') or event['T'],
+                )
+            self.version += 1
+
+    def sorted_orders(self) -> List[OrderRecord]:
+        """Open orders, newest first; re-sorted only after a change"""
+        with self._lock:
+            if self._sorted_version != self.version:
+                self._sorted = sorted(self.orders.values(), key=lambda o: o.time, reverse=True)
+                self._sorted_version = self.version
+            return self._sorted
+
+    def snapshot(self) -> Tuple[List[BalanceRecord], List[FillRecord]]:
+        with self._lock:
+            balances = sorted(self.balances.values(), key=lambda b: b.asset)
+            return balances, list(self.fills)
+
+
+class _PanelHandler(logging.Handler):
+    """Keeps recent log lines for the dashboard's log panel instead of writing to the terminal"""
+
+    def __init__(self, lines: deque) -> None:
+        super().__init__(logging.INFO)
+        self.lines = lines
+        self.count = 0
+        self.setFormatter(logging.Formatter('%(levelname)-8s %(message)s'))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.lines.append(self.format(record).splitlines()[0])
+            self.count += 1
+        except Exception:
+            self.handleError(record)
+
+
+class Dashboard:
+    """Full-screen live view of a DashboardState.
+
+    Frames are rendered as plain lines and compared with the previous
+    frame; only the changed span of each changed line is written, and
+    nothing is drawn when neither the state, the clock second nor the
+    scroll position moved. Only the visible slice of the open orders is
+    formatted, so thousands of orders scroll as cheaply as ten. While it
+    runs, console log output goes to a log panel, since writes to stdout
+    would land on cells the diff never repaints.
+    """
+
+    def __init__(self, bot, state: DashboardState, fps: float = 10.0) -> None:
+        self.bot = bot
+        self.state = state
+        self.fps = fps
+        self.offset = 0
+        self._page = 10
+        self._last: List[Line] = []
+        self._log = _PanelHandler(deque(maxlen=LOG_ROWS))
+
+    def _header(self) -> str:
+        risk = self.bot.risk
+        stream = "live" if self.bot.user_stream_active else "no stream"
+        return (
+            f" BINANCE SPOT DASHBOARD  {datetime.now():%H:%M:%S}  [{stream}]  "
+            f"exposure {risk.gross_exposure:,.2f}  realised {risk.realized_pnl:+,.2f}  "
+            f"risk orders {len(risk.open_orders)}"
+        )
+
+    def render(self, width: int, height: int) -> List[Line]:
+        """Every screen line for the current state, each padded to width"""
+        import curses
+        bold, reverse = curses.A_BOLD, curses.A_REVERSE
+        balances, fills = self.state.snapshot()
+        orders = self.state.sorted_orders()
+        lines: List[Line] = [(self._header(), reverse)]
+
+        def section(title: str, rows: List[str], height: int) -> None:
+            lines.append((title, bold))
+            rows = rows[:height] or ["  none"]
+            lines.extend((row, 0) for row in rows + [""] * (height - len(rows)))
+
+        per_row = max(1, width // BALANCE_CELL)
+        cells = [f"{b.asset:<6} {float(b.free):>12.6f} / {float(b.locked):<10.4f}"
+                 for b in balances[:per_row * BALANCE_ROWS]]
+        section(f"BALANCES ({len(balances)})", [
+            "".join(f"{c:<{BALANCE_CELL}}" for c in cells[i:i + per_row]) for i in range(0, len(cells), per_row)
+        ], BALANCE_ROWS)
+
+        running = twap.running_snapshot()
+        now = time.time()
+        section(f"RUNNING TWAPS ({len(running)})", [
+            f"  {p['symbol']:<12} {p['side']:<5} slice {p['done']}/{p['slices']}  "
+            f"filled {p['filled']:.6f}/{p['quantity']:.6f}  next in {max(p['next_at'] - now, 0):.0f}s"
+            for p in running
+        ], TWAP_ROWS)
+
+        section(f"RECENT FILLS ({len(fills)})", [
+            f"  {datetime.fromtimestamp(f.time / 1000):%H:%M:%S}  {f.symbol:<12} {f.side:<5} "
+            f"{float(f.qty):>14.6f} @ {float(f.price):<14.6f} fee {f.commission} {f.commission_asset}"
+            for f in reversed(fills[-FILL_ROWS:])
+        ], FILL_ROWS)
+
+        section("LOG", [f"  {line}" for line in reversed(self._log.lines)], LOG_ROWS)
+
+        # open orders take whatever rows are left, minus column header and footer
+        self._page = max(1, height - len(lines) - 3)
+        self.offset = max(0, min(self.offset, len(orders) - self._page))
+        visible = orders[self.offset:self.offset + self._page]
+        shown = f"{self.offset + 1}-{self.offset + len(visible)} of {len(orders)}" if orders else "0"
+        lines.append((f"OPEN ORDERS ({shown})", bold))
+        lines.append((
+            f"  {'ID':<12} {'Symbol':<12} {'Side':<5} {'Type':<17} {'Price':>14} "
+            f"{'Qty':>14} {'Filled':>14} {'Status':<16} {'Time':<8}", bold
+        ))
+        for o in visible:
+            lines.append((
+                f"  {o.order_id:<12} {o.symbol:<12} {o.side:<5} {o.type:<17} {float(o.price):>14.6f} "
+                f"{float(o.orig_qty):>14.6f} {float(o.executed_qty):>14.6f} {o.status:<16} "
+                f"{datetime.fromtimestamp(o.time / 1000):%H:%M:%S}", 0
+            ))
+
+        lines = lines[:height - 1]
+        lines += [("", 0)] * (height - 1 - len(lines))
+        lines.append((" q quit   Up/Down PgUp/PgDn Home/End scroll orders", reverse))
+        # the last cell of the screen cannot be written without an error
+        return [(text[:width - 1].ljust(width - 1), attr) for text, attr in lines]
+
+    def _draw(self, screen, lines: List[Line]) -> None:
+        for row, (text, attr) in enumerate(lines):
+            old = self._last[row] if row < len(self._last) else None
+            if old == (text, attr):
+                continue
+            start, end = 0, len(text)
+            if old is not None and old[1] == attr and len(old[0]) == len(text):
+                while start < end and old[0][start] == text[start]:
+                    start += 1
+                while end > start and old[0][end - 1] == text[end - 1]:
+                    end -= 1
+            screen.addstr(row, start, text[start:end], attr)
+        self._last = lines
+        screen.noutrefresh()
+
+    def _handle_key(self, key: int) -> bool:
+        """Apply a key press; False means quit"""
+        import curses
+        if key in (ord('q'), ord('Q'), 27):
+            return False
+        moves = {
+            curses.KEY_UP: -1, curses.KEY_DOWN: 1,
+            curses.KEY_PPAGE: -self._page, curses.KEY_NPAGE: self._page,
+            curses.KEY_HOME: -10 ** 9, curses.KEY_END: 10 ** 9,
+        }
+        if key in moves:
+            self.offset = max(0, self.offset + moves[key])
+        elif key == curses.KEY_RESIZE:
+            self._last = []
+        return True
+
+    def _loop(self, screen) -> None:
+        import curses
+        curses.curs_set(0)
+        screen.keypad(True)
+        frame = 1.0 / self.fps
+        screen.timeout(int(frame * 1000))
+        drawn = None
+        next_frame = 0.0
+
+        while True:
+            key = screen.getch()
+            if key != -1:
+                if not self._handle_key(key):
+                    return
+                if key == curses.KEY_RESIZE:
+                    screen.clear()
+                    drawn = None
+
+            now = time.monotonic()
+            if now < next_frame:
+                continue
+            height, width = screen.getmaxyx()
+            marker = (self.state.version, int(time.time()), self.offset, width, height, self._log.count, len(twap.running))
+            if marker != drawn:
+                self._draw(screen, self.render(width, height))
+                curses.doupdate()
+                drawn = marker
+            next_frame = now + frame
+
+    def run(self) -> None:
+        """Take over the terminal until the user presses q"""
+        import curses
+        logger.info("Dashboard opened")
+        console = [h for h in logger.handlers
+                   if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler)]
+        last_resort = logging.lastResort
+        for handler in console:
+            logger.removeHandler(handler)
+        logger.addHandler(self._log)
+        logging.lastResort = self._log  # other libraries' unhandled warnings
+        try:
+            curses.wrapper(self._loop)
+        finally:
+            logging.lastResort = last_resort
+            logger.removeHandler(self._log)
+            for handler in console:
+                logger.addHandler(handler)
+        logger.info("Dashboard closed")
+
+
+def open_dashboard(bot, state: DashboardState = None, fps: float = 10.0) -> DashboardState:
+    """Start the user stream if needed, seed state once and run the dashboard"""
+    bot.ensure_user_stream()
+    if state is None:
+        state = DashboardState(bot)
+        state.load()
+    Dashboard(bot, state, fps).run()
+    return state
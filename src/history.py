@@ -0,0 +1,163 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+import numpy as np
+from logger import logger
+from market_store import (
+    AGG_TRADE_COLUMNS, DAY_MS, KLINE_COLUMNS, MarketDataStore, dataset_name, day_start_ms
+)
+
+PAGE_LIMIT = 1000
+HOUR_MS = 3_600_000
+
+
+def _kline_columns(rows: List[list]) -> Dict[str, np.ndarray]:
+    """Convert raw kline rows (lists of strings/ints) to typed columns"""
+    columns = {}
+    for i, (name, dtype) in enumerate(KLINE_COLUMNS.items()):
+        columns[name] = np.asarray([row[i] for row in rows], dtype=dtype)
+    return columns
+
+
+def _agg_trade_columns(rows: List[dict]) -> Dict[str, np.ndarray]:
+    """Convert raw aggTrades (dicts keyed a/p/q/f/l/T/m) to typed columns"""
+    keys = ('a', 'p', 'q', 'f', 'l', 'T', 'm')
+    return {
+        name: np.asarray([row[key] for row in rows], dtype=dtype)
+        for (name, dtype), key in zip(AGG_TRADE_COLUMNS.items(), keys)
+    }
+
+
+class HistoryDownloader:
+    """Bulk download of klines and aggTrades into a MarketDataStore.
+
+    Work is split into (symbol, day) tasks run on a thread pool; each task
+    pages through the REST endpoint and writes one partition. Days that are
+    already stored are skipped, except the current UTC day which is
+    re-fetched because it is still growing.
+    """
+
+    def __init__(self, client, store: MarketDataStore, max_workers: int = 4) -> None:
+        self.client = client
+        self.store = store
+        self.max_workers = max_workers
+
+    def _fetch_klines_day(self, symbol: str, interval: str, day: date) -> Dict[str, np.ndarray]:
+        start = day_start_ms(day)
+        end = start + DAY_MS
+        rows = []
+        while start < end:
+            page = self.client.get_klines(
+                symbol=symbol, interval=interval,
+                startTime=start, endTime=end - 1, limit=PAGE_LIMIT
+            )
+            if not page:
+                break
+            rows.extend(page)
+            start = page[-1][0] + 1
+            if len(page) < PAGE_LIMIT:
+                break
+        return _kline_columns(rows)
+
+    def _fetch_agg_trades_day(self, symbol: str, day: date) -> Dict[str, np.ndarray]:
+        start = day_start_ms(day)
+        end = start + DAY_MS
+        rows = []
+
+        # the first page must be found by time (windows of at most one hour),
+        # after that pages are chained by trade id
+        window = start
+        while window < end and not rows:
+            rows = self.client.get_aggregate_trades(
+                symbol=symbol, startTime=window,
+                endTime=min(window + HOUR_MS, end) - 1, limit=PAGE_LIMIT
+            )
+            window += HOUR_MS
+
+        while rows and rows[-1]['T'] < end:
+            page = self.client.get_aggregate_trades(
+                symbol=symbol, fromId=rows[-1]['a'] + 1, limit=PAGE_LIMIT
+            )
+            if not page:
+                break
+            rows.extend(page)
+
+        rows = [row for row in rows if row['T'] < end]
+        return _agg_trade_columns(rows)
+
+    def _run(self, dataset: str, symbols: List[str], start: date, end: date, fetch) -> int:
+        today = datetime.now(timezone.utc).date()
+        tasks = []
+        day = start
+        while day <= end:
+            for symbol in symbols:
+                if day == today or not self.store.has_partition(dataset, symbol, day):
+                    tasks.append((symbol, day))
+            day += timedelta(days=1)
+
+        logger.info(f"Downloading {dataset}: {len(tasks)} symbol-days with {self.max_workers} workers")
+        stored = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fetch, symbol, day): (symbol, day) for symbol, day in tasks}
+            for future in as_completed(futures):
+                symbol, day = futures[future]
+                try:
+                    columns = future.result()
+                    self.store.write_partition(dataset, symbol, day, columns)
+                    stored += 1
+                except Exception as e:
+                    logger.error(f"Download failed for {dataset} {symbol} {day}: {str(e)}")
+
+        logger.info(f"Stored {stored}/{len(tasks)} {dataset} partitions")
+        return stored
+
+    def download_klines(self, symbols: List[str], start: date, end: date, interval: str = '1m') -> int:
+        """Fetch klines for every symbol and day in [start, end]"""
+        dataset = dataset_name('klines', interval)
+        return self._run(
+            dataset, symbols, start, end,
+            lambda symbol, day: self._fetch_klines_day(symbol, interval, day)
+        )
+
+    def download_agg_trades(self, symbols: List[str], start: date, end: date) -> int:
+        """Fetch aggregated trades for every symbol and day in [start, end]"""
+        return self._run('aggtrades', symbols, start, end, self._fetch_agg_trades_day)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download historical market data")
+    parser.add_argument("kind", choices=("klines", "aggtrades"))
+    parser.add_argument(
+        "symbols", nargs="*",
+        default=[s for s in os.getenv("HISTORY_SYMBOLS", "").split(",") if s],
+        help="symbols to fetch (default: HISTORY_SYMBOLS from the environment)"
+    )
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first UTC day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, help="last UTC day (default: today)")
+    parser.add_argument("--interval", default="1m", help="kline interval")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--data-dir", help="store root (default: MARKET_DATA_DIR or ./data)")
+    parser.add_argument("--testnet", action="store_true", help="download from the spot testnet instead of live public data")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from binance import Client
+
+    args = parse_args()
+    if not args.symbols:
+        raise SystemExit("No symbols given and HISTORY_SYMBOLS is not set")
+
+    end = args.end or datetime.now(timezone.utc).date()
+    downloader = HistoryDownloader(
+        Client(testnet=args.testnet, ping=False),
+        MarketDataStore(args.data_dir),
+        max_workers=args.workers
+    )
+    symbols = [s.upper() for s in args.symbols]
+    if args.kind == "klines":
+        downloader.download_klines(symbols, args.start, end, args.interval)
+    else:
+        downloader.download_agg_trades(symbols, args.start, end)
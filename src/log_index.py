@@ -0,0 +1,298 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# one entry per line written by logger.setup_logger's file format; lines that
+# do not start with a header (tracebacks, separators) belong to the entry above
+HEADER = re.compile(rb'^(\d{4}-\d\d-\d\d \d\d:\d\d):(\d\d) \| [^|\n]*\| (\w+) *\| ', re.M)
+SYMBOL = re.compile(rb'\b([A-Z0-9]{2,12}(?:USDT|FDUSD|USDC|BUSD|TUSD|BTC|ETH|BNB))\b')
+# regex candidates are checked against exchange info, cached this long
+SYMBOLS_CACHE_SECONDS = 86_400
+# per-entry and posting arrays, saved in every index segment
+COLUMNS = {
+    'offsets': np.int64, 'times': np.int64, 'levels': np.int8,
+    'symbol_entries': np.int64, 'symbol_keys': np.int32,
+    'order_entries': np.int64, 'order_ids': np.int64,
+}
+ORDER_ID = re.compile(rb"(?:'orderId': |[Oo]rder ID:? |[Oo]rder (?:id )?|orderId=)(\d+)")
+
+
+class LogIndex:
+    """Index of one log file by timestamp, level, symbol and orderId.
+
+    The log is memory-mapped and only the bytes appended since the last
+    update are parsed. Entries are stored as parallel numpy arrays (offset,
+    time, level) plus (entry, key) posting arrays for symbols and order ids,
+    in a <log>.idx directory: each update writes only a segment for the new
+    tail plus a small meta.json. Trailing segments are merged when the
+    older one is no larger than the newer, so the segment count stays
+    logarithmic and each entry is rewritten O(log n) times overall.
+
+    valid_symbols, when given, restricts symbol postings to real trading
+    pairs so asset names such as WBETH are not mistaken for symbols.
+    """
+
+    def __init__(self, log_path: str, index_dir: Optional[str] = None,
+                 valid_symbols: Optional[Set[str]] = None) -> None:
+        self.log_path = log_path
+        self.index_dir = index_dir or f"{log_path}.idx"
+        self.valid_symbols = valid_symbols
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        self.indexed_bytes = 0
+        self.inode = 0
+        self.segments: List[dict] = []
+        self.next_segment = 0
+        for name in COLUMNS:
+            setattr(self, name, np.empty(0, dtype=COLUMNS[name]))
+        self.symbols: List[str] = []
+
+    def _load(self) -> None:
+        meta_path = os.path.join(self.index_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['validated'] != (self.valid_symbols is not None):
+                self._clear_dir()  # built with a different symbol filter
+                return
+            parts = [self._read_segment(seg['name']) for seg in meta['segments']]
+            self.indexed_bytes = meta['indexed_bytes']
+            self.inode = meta['inode']
+            self.segments = meta['segments']
+            self.next_segment = meta['next_segment']
+            self.symbols = meta['symbols']
+            for name, dtype in COLUMNS.items():
+                setattr(self, name, np.concatenate([np.empty(0, dtype=dtype)] + [p[name] for p in parts]))
+        except Exception:
+            self._reset()
+
+    def _read_segment(self, name: str) -> Dict[str, np.ndarray]:
+        with np.load(os.path.join(self.index_dir, name), allow_pickle=False) as data:
+            return {column: data[column] for column in COLUMNS}
+
+    def _write_segment(self, arrays: Dict[str, np.ndarray]) -> dict:
+        name = f"seg-{self.next_segment:06d}.npz"
+        self.next_segment += 1
+        np.savez(os.path.join(self.index_dir, name), **arrays)
+        return {'name': name, 'entries': len(arrays['offsets'])}
+
+    def _compact(self) -> None:
+        """Merge trailing segments while the older one is no larger than the newer"""
+        while len(self.segments) >= 2 and self.segments[-2]['entries'] <= self.segments[-1]['entries']:
+            newer, older = self.segments.pop(), self.segments.pop()
+            a, b = self._read_segment(older['name']), self._read_segment(newer['name'])
+            self.segments.append(self._write_segment({k: np.concatenate([a[k], b[k]]) for k in COLUMNS}))
+            self._write_meta()
+            for seg in (older, newer):
+                os.remove(os.path.join(self.index_dir, seg['name']))
+
+    def _write_meta(self) -> None:
+        meta = {
+            'indexed_bytes': self.indexed_bytes, 'inode': self.inode, 'symbols': self.symbols,
+            'segments': self.segments, 'next_segment': self.next_segment,
+            'validated': self.valid_symbols is not None,
+        }
+        tmp = os.path.join(self.index_dir, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.index_dir, 'meta.json'))
+
+    def _clear_dir(self) -> None:
+        if os.path.isdir(self.index_dir):
+            for name in os.listdir(self.index_dir):
+                os.remove(os.path.join(self.index_dir, name))
+
+    def update(self) -> int:
+        """Index lines appended since the last update; returns new entry count"""
+        if not os.path.exists(self.log_path):
+            return 0
+
+        stat = os.stat(self.log_path)
+        if stat.st_ino != self.inode or stat.st_size < self.indexed_bytes:
+            self._reset()  # rotated or truncated
+            self._clear_dir()
+            self.inode = stat.st_ino
+        if stat.st_size == self.indexed_bytes:
+            return 0
+
+        with open(self.log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.rfind(b'\n', self.indexed_bytes) + 1
+            if end <= self.indexed_bytes:
+                return 0  # no complete line yet
+
+            offsets, times, levels = [], [], []
+            symbol_entries, symbol_keys, order_entries, order_ids = [], [], [], []
+            symbol_ids = {s: i for i, s in enumerate(self.symbols)}
+            minute_cache = {}
+            level_codes = {name.encode(): i for i, name in enumerate(LEVELS)}
+            valid = self.valid_symbols
+            base = len(self.offsets)
+
+            headers = list(HEADER.finditer(mm, self.indexed_bytes, end))
+            for n, match in enumerate(headers):
+                entry_end = headers[n + 1].start() if n + 1 < len(headers) else end
+                entry = base + n
+
+                minute = match.group(1)
+                epoch = minute_cache.get(minute)
+                if epoch is None:
+                    epoch = int(time.mktime(time.strptime(minute.decode(), '%Y-%m-%d %H:%M')))
+                    minute_cache[minute] = epoch
+
+                offsets.append(match.start())
+                times.append(epoch + int(match.group(2)))
+                levels.append(level_codes.get(match.group(3), -1))
+
+                body = mm[match.end():entry_end]
+                for symbol in {m.group(1).decode() for m in SYMBOL.finditer(body)}:
+                    if valid is not None and symbol not in valid:
+                        continue
+                    key = symbol_ids.get(symbol)
+                    if key is None:
+                        key = symbol_ids[symbol] = len(self.symbols)
+                        self.symbols.append(symbol)
+                    symbol_entries.append(entry)
+                    symbol_keys.append(key)
+                for order_id in {int(m.group(1)) for m in ORDER_ID.finditer(body)}:
+                    order_entries.append(entry)
+                    order_ids.append(order_id)
+
+        tail = {
+            'offsets': offsets, 'times': times, 'levels': levels,
+            'symbol_entries': symbol_entries, 'symbol_keys': symbol_keys,
+            'order_entries': order_entries, 'order_ids': order_ids,
+        }
+        tail = {name: np.asarray(tail[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        for name in COLUMNS:
+            setattr(self, name, np.concatenate([getattr(self, name), tail[name]]))
+        self.indexed_bytes = end
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.segments.append(self._write_segment(tail))
+        self._write_meta()
+        self._compact()
+        return len(offsets)
+
+    def select(self, start: Optional[float] = None, end: Optional[float] = None,
+               min_level: Optional[str] = None, symbol: Optional[str] = None,
+               order_id: Optional[int] = None) -> np.ndarray:
+        """Entry numbers matching every given filter, in file order"""
+        mask = np.ones(len(self.offsets), dtype=bool)
+        if start is not None:
+            mask &= self.times >= start
+        if end is not None:
+            mask &= self.times < end
+        if min_level is not None:
+            mask &= self.levels >= LEVELS.index(min_level.upper())
+        if symbol is not None:
+            if symbol not in self.symbols:
+                return np.empty(0, dtype=np.int64)
+            hits = np.zeros_like(mask)
+            hits[self.symbol_entries[self.symbol_keys == self.symbols.index(symbol)]] = True
+            mask &= hits
+        if order_id is not None:
+            hits = np.zeros_like(mask)
+            hits[self.order_entries[self.order_ids == order_id]] = True
+            mask &= hits
+        return np.flatnonzero(mask)
+
+    def read(self, entries: np.ndarray) -> Iterator[Tuple[int, str]]:
+        """(timestamp, text) for each entry, reading only those byte ranges"""
+        if not len(entries):
+            return
+        with open(self.log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for entry in entries:
+                start = self.offsets[entry]
+                stop = self.offsets[entry + 1] if entry + 1 < len(self.offsets) else self.indexed_bytes
+                yield int(self.times[entry]), mm[start:stop].decode(errors='replace').rstrip('\n')
+
+
+def exchange_symbols(cache_path: str, testnet: bool = False) -> Optional[Set[str]]:
+    """Trading pair names from exchange info, cached for a day; None if unavailable"""
+    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < SYMBOLS_CACHE_SECONDS:
+        with open(cache_path) as f:
+            return set(json.load(f))
+    try:
+        from binance import Client
+        info = Client(testnet=testnet, ping=False).get_exchange_info()
+    except Exception:
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return set(json.load(f))  # stale is better than unfiltered
+        return None
+
+    symbols = sorted(s['symbol'] for s in info['symbols'])
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump(symbols, f)
+    return set(symbols)
+
+
+def _parse_when(value: str) -> float:
+    """today, yesterday, YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS] as local epoch seconds"""
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if value == 'today':
+        return midnight.timestamp()
+    if value == 'yesterday':
+        return (midnight - timedelta(days=1)).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query bot logs through an incremental index")
+    parser.add_argument("--log", nargs="*", help="log files (default: bot.log*)")
+    parser.add_argument("--day", help="only this day: today, yesterday or YYYY-MM-DD")
+    parser.add_argument("--since", help="start time: today, yesterday, YYYY-MM-DD[ HH:MM[:SS]]")
+    parser.add_argument("--until", help="end time (exclusive), same formats as --since")
+    parser.add_argument("--level", choices=LEVELS, help="minimum level")
+    parser.add_argument("--symbol", help="entries mentioning this symbol")
+    parser.add_argument("--order", type=int, help="entries mentioning this order id")
+    parser.add_argument("--limit", type=int, help="show only the last N matches")
+    parser.add_argument("--testnet", action="store_true", help="validate symbols against testnet exchange info")
+    parser.add_argument("--no-validate", action="store_true", help="index every symbol-like word without checking exchange info")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = args.log or sorted(p for p in glob.glob("bot.log*") if os.path.isfile(p) and not p.endswith(".npz"))
+
+    valid = None
+    if not args.no_validate:
+        data_dir = os.getenv("MARKET_DATA_DIR", "data")
+        valid = exchange_symbols(os.path.join(data_dir, f"exchange_symbols{'_testnet' if args.testnet else ''}.json"), args.testnet)
+        if valid is None:
+            print("Exchange info unavailable; indexing symbols unvalidated", file=sys.stderr)
+
+    start = _parse_when(args.since) if args.since else None
+    end = _parse_when(args.until) if args.until else None
+    if args.day:
+        start = _parse_when(args.day)
+        end = start + 86_400
+
+    matches = []
+    for path in paths:
+        index = LogIndex(path, valid_symbols=valid)
+        index.update()
+        entries = index.select(start, end, args.level, args.symbol.upper() if args.symbol else None, args.order)
+        matches.extend(index.read(entries))
+
+    matches.sort(key=lambda m: m[0])
+    if args.limit:
+        matches = matches[-args.limit:]
+    for _, text in matches:
+        print(text)
@@ -0,0 +1,145 @@
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, NamedTuple, Optional
+from logger import logger
+
+# per-symbol row: seq, bid, bid_qty, ask, ask_qty, update_time
+ROW_WIDTH = 6
+DOUBLE_SIZE = 8
+# a row still odd after this many tries belongs to a writer that died mid-update
+READ_RETRIES = 1000
+
+
+class Tick(NamedTuple):
+    symbol: str
+    bid: float
+    bid_qty: float
+    ask: float
+    ask_qty: float
+    update_time: float
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+
+class SharedTickBook:
+    """Best bid/ask per symbol in a shared memory block.
+
+    One writer (the market-data process) and any number of readers. Each
+    row is guarded by a sequence counter: the writer makes it odd while
+    updating, readers retry until they see the same even value twice.
+    """
+
+    def __init__(self, symbols: List[str], name: Optional[str] = None, create: bool = False) -> None:
+        self.symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        size = len(self.symbols) * ROW_WIDTH * DOUBLE_SIZE
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = create
+
+        self._view = self._shm.buf.cast('d')
+        if create:
+            for i in range(len(self._view)):
+                self._view[i] = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def publish(self, symbol: str, bid: float, bid_qty: float, ask: float, ask_qty: float) -> None:
+        """Write a new top of book for symbol (market-data process only)"""
+        i = self._index.get(symbol)
+        if i is None:
+            return
+        row = i * ROW_WIDTH
+        view = self._view
+        view[row] += 1
+        view[row + 1] = bid
+        view[row + 2] = bid_qty
+        view[row + 3] = ask
+        view[row + 4] = ask_qty
+        view[row + 5] = time.time()
+        view[row] += 1
+
+    def read(self, symbol: str, max_age: Optional[float] = None) -> Optional[Tick]:
+        """Consistent snapshot of symbol's top of book.
+
+        None before the first tick, when the row cannot be read consistently
+        (writer died mid-update) or when the tick is older than max_age seconds.
+        """
+        i = self._index.get(symbol)
+        if i is None:
+            return None
+        row = i * ROW_WIDTH
+        view = self._view
+        for _ in range(READ_RETRIES):
+            seq = view[row]
+            if seq == 0:
+                return None
+            if seq % 2:
+                continue
+            values = view[row + 1:row + ROW_WIDTH].tolist()
+            if view[row] == seq:
+                tick = Tick(symbol, *values)
+                if max_age is not None and time.time() - tick.update_time > max_age:
+                    return None
+                return tick
+        return None
+
+    def close(self) -> None:
+        """Detach from the block, removing it if this instance created it"""
+        self._view.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def run_publisher(shm_name: str, symbols: List[str], stop_event,
+                  on_tick: Optional[Callable[[Tick, int], None]] = None) -> None:
+    """Market-data process: stream bookTicker for symbols into the shared book.
+
+    on_tick, if given, is called on the stream thread after each publish
+    with the tick and the perf_counter_ns at which the message arrived;
+    it only reaches consumers in the publisher's own process.
+    """
+    from binance import ThreadedWebsocketManager
+
+    book = SharedTickBook(symbols, name=shm_name)
+
+    def handle_message(msg):
+        received_ns = time.perf_counter_ns()
+        data = msg.get('data', msg)
+        if data.get('e') == 'error':
+            logger.error(f"Market data stream error: {data.get('m')}")
+            return
+        try:
+            tick = Tick(data['s'], float(data['b']), float(data['B']), float(data['a']), float(data['A']), time.time())
+        except KeyError:
+            logger.debug(f"Ignoring market data message: {msg}")
+            return
+        book.publish(tick.symbol, tick.bid, tick.bid_qty, tick.ask, tick.ask_qty)
+        if on_tick is not None:
+            try:
+                on_tick(tick, received_ns)
+            except Exception as e:
+                logger.error(f"Tick listener failed for {tick.symbol}: {str(e)}")
+
+    twm = ThreadedWebsocketManager(testnet=True)
+    try:
+        twm.start()
+        streams = [f"{symbol.lower()}@bookTicker" for symbol in symbols]
+        twm.start_multiplex_socket(callback=handle_message, streams=streams)
+        logger.info(f"Market data publisher streaming {len(symbols)} symbols")
+        stop_event.wait()
+    except Exception as e:
+        logger.error(f"Market data publisher failed: {str(e)}")
+        raise
+    finally:
+        twm.stop()
+        book.close()
+        logger.info("Market data publisher stopped")
@@ -1,4 +1,3 @@
-from binance.enums import *
 from logger import logger
 
 @staticmethod
@@ -8,7 +7,7 @@ def market_order(client, symbol, side, quantity):
         order = client.order_market(
             symbol=symbol,
             side = side,
-            type=FUTURE_ORDER_TYPE_MARKET,
+            type="MARKET",
             quantity = str(quantity)
         )
 
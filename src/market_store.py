@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from logger import logger
+
+DAY_MS = 86_400_000
+
+KLINE_COLUMNS = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_volume': np.float64,
+    'trades': np.int64,
+    'taker_buy_base': np.float64,
+    'taker_buy_quote': np.float64,
+}
+
+AGG_TRADE_COLUMNS = {
+    'agg_id': np.int64,
+    'price': np.float64,
+    'qty': np.float64,
+    'first_id': np.int64,
+    'last_id': np.int64,
+    'time': np.int64,
+    'is_buyer_maker': np.bool_,
+}
+
+# column each dataset is sorted and range-queried by
+TIME_COLUMN = {
+    'aggtrades': 'time',
+}
+
+
+def dataset_name(kind: str, interval: Optional[str] = None) -> str:
+    """Directory name for a dataset, e.g. klines_1m or aggtrades"""
+    return f"{kind}_{interval}" if interval else kind
+
+
+def day_start_ms(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class MarketDataStore:
+    """Columnar market data on disk, partitioned by dataset/symbol/day.
+
+    Each partition is a directory of one .npy file per column, sorted by
+    time. Reads memory-map the files and slice them with a binary search
+    on the time column, so a range query only touches the rows it returns.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or os.getenv("MARKET_DATA_DIR", "data")
+
+    def partition_path(self, dataset: str, symbol: str, day: date) -> str:
+        return os.path.join(self.root, dataset, symbol, day.isoformat())
+
+    def has_partition(self, dataset: str, symbol: str, day: date) -> bool:
+        return os.path.isdir(self.partition_path(dataset, symbol, day))
+
+    def symbols(self, dataset: str) -> List[str]:
+        path = os.path.join(self.root, dataset)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def days(self, dataset: str, symbol: str) -> List[date]:
+        path = os.path.join(self.root, dataset, symbol)
+        if not os.path.isdir(path):
+            return []
+        return sorted(date.fromisoformat(name) for name in os.listdir(path) if not name.startswith('.'))
+
+    def write_partition(self, dataset: str, symbol: str, day: date, columns: Dict[str, np.ndarray]) -> None:
+        """Replace one day's partition atomically"""
+        final = self.partition_path(dataset, symbol, day)
+        parent = os.path.dirname(final)
+        os.makedirs(parent, exist_ok=True)
+
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+        try:
+            for name, values in columns.items():
+                np.save(os.path.join(staging, f"{name}.npy"), values)
+            if os.path.isdir(final):
+                shutil.rmtree(final)
+            os.rename(staging, final)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.debug(f"Stored {dataset}/{symbol}/{day}: {len(next(iter(columns.values()), []))} rows")
+
+    def _open_column(self, path: str, name: str) -> np.ndarray:
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+    def read(self, dataset: str, symbol: str, start_ms: int, end_ms: int,
+             columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Rows with start_ms <= time < end_ms, as one array per column"""
+        time_column = TIME_COLUMN.get(dataset, 'open_time')
+        chunks: Dict[str, List[np.ndarray]] = {}
+
+        for day in self.days(dataset, symbol):
+            day_start = day_start_ms(day)
+            if day_start >= end_ms or day_start + DAY_MS <= start_ms:
+                continue
+
+            path = self.partition_path(dataset, symbol, day)
+            times = self._open_column(path, time_column)
+            lo = int(np.searchsorted(times, start_ms, side='left'))
+            hi = int(np.searchsorted(times, end_ms, side='left'))
+            if lo >= hi:
+                continue
+
+            names = columns or [f[:-4] for f in sorted(os.listdir(path)) if f.endswith('.npy')]
+            for name in names:
+                chunks.setdefault(name, []).append(self._open_column(path, name)[lo:hi])
+
+        if not chunks:
+            schema = AGG_TRADE_COLUMNS if dataset == 'aggtrades' else KLINE_COLUMNS
+            return {name: np.empty(0, dtype=schema[name]) for name in (columns or schema)}
+
+        return {name: np.concatenate(parts) for name, parts in chunks.items()}
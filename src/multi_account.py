@@ -0,0 +1,119 @@
+import itertools
+import multiprocessing as mp
+import queue
+from typing import Any, Iterator, List, Optional, Tuple
+from config import AccountConfig, account_names
+from logger import logger
+from market_data import SharedTickBook, run_publisher
+
+
+def _account_worker(account: str, shm_name: str, symbols: List[str], exchange_info: dict, tasks, results) -> None:
+    """Worker process: one TradingBot per account, reading prices from shared memory"""
+    from bot import TradingBot
+
+    market_data = SharedTickBook(symbols, name=shm_name)
+    try:
+        bot = TradingBot(
+            config=AccountConfig(account),
+            exchange_info=exchange_info,
+            market_data=market_data
+        )
+        logger.info(f"Account worker '{account}' ready")
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, order = task
+            success, response = bot.place_order(**order)
+            results.put((task_id, account, success, response))
+    except Exception as e:
+        logger.error(f"Account worker '{account}' failed: {str(e)}")
+        results.put((None, account, False, str(e)))
+    finally:
+        market_data.close()
+
+
+class MultiAccountRunner:
+    """Run one TradingBot per account across processes with shared market data.
+
+    A single market-data process streams best bid/ask for symbols into a
+    SharedTickBook. Exchange info is downloaded once here and handed to each
+    account worker, so adding accounts does not add market-data load.
+    """
+
+    def __init__(self, symbols: List[str], accounts: Optional[List[str]] = None) -> None:
+        self.symbols = [s.upper() for s in symbols]
+        self.accounts = accounts or account_names()
+        if not self.accounts:
+            raise ValueError("No accounts configured. Set BINANCE_ACCOUNTS in .env file.")
+
+        self._task_ids = itertools.count(1)
+        self._tasks = {}
+        self._results = mp.Queue()
+        self._workers = []
+        self._publisher = None
+        self._book = None
+        self._stop_event = mp.Event()
+
+    def start(self) -> None:
+        """Start the market-data process and one worker per account"""
+        from binance import Client
+
+        exchange_info = Client(testnet=True).get_exchange_info()
+        logger.info(f"Exchange info loaded once for {len(self.accounts)} accounts")
+
+        self._book = SharedTickBook(self.symbols, create=True)
+        self._publisher = mp.Process(
+            target=run_publisher,
+            args=(self._book.name, self.symbols, self._stop_event),
+            name="market-data",
+            daemon=True
+        )
+        self._publisher.start()
+
+        for account in self.accounts:
+            tasks = mp.Queue()
+            worker = mp.Process(
+                target=_account_worker,
+                args=(account, self._book.name, self.symbols, exchange_info, tasks, self._results),
+                name=f"account-{account}",
+                daemon=True
+            )
+            worker.start()
+            self._tasks[account] = tasks
+            self._workers.append(worker)
+
+        logger.info(f"Multi-account runtime started: {len(self.accounts)} accounts, {len(self.symbols)} symbols")
+
+    def submit(self, account: str, symbol: str, side: str, order_type: str, quantity: float, **kwargs) -> int:
+        """Queue an order for an account's worker and return its task id"""
+        if account not in self._tasks:
+            raise ValueError(f"Unknown account: {account}")
+
+        task_id = next(self._task_ids)
+        order = dict(symbol=symbol, side=side, order_type=order_type, quantity=quantity, **kwargs)
+        self._tasks[account].put((task_id, order))
+        return task_id
+
+    def results(self, timeout: Optional[float] = None) -> Iterator[Tuple[int, str, bool, Any]]:
+        """Yield (task_id, account, success, response) as workers finish orders"""
+        while True:
+            try:
+                yield self._results.get(timeout=timeout)
+            except queue.Empty:
+                return
+
+    def stop(self) -> None:
+        """Stop all workers and the market-data process"""
+        for tasks in self._tasks.values():
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+
+        self._stop_event.set()
+        if self._publisher is not None:
+            self._publisher.join(timeout=10)
+        if self._book is not None:
+            self._book.close()
+        logger.info("Multi-account runtime stopped")
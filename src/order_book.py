@@ -0,0 +1,346 @@
+import bisect
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from logger import logger
+
+SNAPSHOT_LIMIT = 1000
+# resync: snapshot attempts per gap, backoff between them, and how long to wait after giving up
+RESYNC_ATTEMPTS = 5
+RESYNC_BACKOFF = 0.5
+RESYNC_BACKOFF_MAX = 8.0
+RESYNC_COOLDOWN = 30.0
+# depth events kept while waiting for a snapshot
+BUFFER_LIMIT = 5000
+
+
+class ImpactEstimate(NamedTuple):
+    side: str
+    quantity: float
+    filled_qty: float
+    avg_price: float
+    worst_price: float
+    best_price: float
+    levels: int
+
+    @property
+    def slippage_bps(self) -> float:
+        """Average fill price versus best price, in basis points (always >= 0)"""
+        if not self.best_price:
+            return 0.0
+        return abs(self.avg_price - self.best_price) / self.best_price * 10_000
+
+    @property
+    def complete(self) -> bool:
+        return self.filled_qty >= self.quantity
+
+
+class _BookSide:
+    """Price levels kept sorted by distance from the touch.
+
+    keys holds sort keys (ask price, or negated bid price) so both sides
+    are walked in ascending key order. Cumulative quantity and notional
+    arrays are rebuilt lazily after updates, so an estimate is two binary
+    searches.
+    """
+    __slots__ = ('sign', 'keys', 'qtys', '_cum_qty', '_cum_notional', '_prices')
+
+    def __init__(self, sign: int) -> None:
+        self.sign = sign
+        self.keys: List[float] = []
+        self.qtys: List[float] = []
+        self._cum_qty = None
+
+    def clear(self) -> None:
+        self.keys.clear()
+        self.qtys.clear()
+        self._cum_qty = None
+
+    def set(self, price: float, qty: float) -> None:
+        key = price * self.sign
+        i = bisect.bisect_left(self.keys, key)
+        present = i < len(self.keys) and self.keys[i] == key
+        if qty == 0:
+            if present:
+                del self.keys[i]
+                del self.qtys[i]
+        elif present:
+            self.qtys[i] = qty
+        else:
+            self.keys.insert(i, key)
+            self.qtys.insert(i, qty)
+        self._cum_qty = None
+
+    def best(self) -> Optional[float]:
+        return self.keys[0] * self.sign if self.keys else None
+
+    def _arrays(self):
+        if self._cum_qty is None:
+            self._prices = np.asarray(self.keys, dtype=np.float64) * self.sign
+            qtys = np.asarray(self.qtys, dtype=np.float64)
+            self._cum_qty = np.cumsum(qtys)
+            self._cum_notional = np.cumsum(qtys * self._prices)
+        return self._prices, self._cum_qty, self._cum_notional
+
+    def walk(self, quantity: float):
+        """(filled qty, notional, worst price, levels touched) for taking quantity"""
+        prices, cum_qty, cum_notional = self._arrays()
+        if not len(prices):
+            return 0.0, 0.0, 0.0, 0
+
+        i = int(np.searchsorted(cum_qty, quantity, side='left'))
+        if i >= len(prices):
+            return float(cum_qty[-1]), float(cum_notional[-1]), float(prices[-1]), len(prices)
+
+        before_qty = float(cum_qty[i - 1]) if i else 0.0
+        before_notional = float(cum_notional[i - 1]) if i else 0.0
+        notional = before_notional + (quantity - before_qty) * float(prices[i])
+        return quantity, notional, float(prices[i]), i + 1
+
+    def depth_within(self, limit_price: float) -> float:
+        """Total quantity at prices no worse than limit_price"""
+        _, cum_qty, _ = self._arrays()
+        i = bisect.bisect_right(self.keys, limit_price * self.sign)
+        return float(cum_qty[i - 1]) if i else 0.0
+
+
+class OrderBook:
+    """Local L2 book for one symbol, kept in sync from a snapshot plus diff events"""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.bids = _BookSide(-1)
+        self.asks = _BookSide(1)
+        self.last_update_id = 0
+        self.synced = False
+        self._lock = threading.Lock()
+
+    def apply_snapshot(self, snapshot: dict) -> None:
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, qty in snapshot['bids']:
+                self.bids.set(float(price), float(qty))
+            for price, qty in snapshot['asks']:
+                self.asks.set(float(price), float(qty))
+            self.last_update_id = snapshot['lastUpdateId']
+            self.synced = False
+
+    def apply_diff(self, event: dict) -> bool:
+        """Apply a depthUpdate event; False means a gap was detected and a resync is needed"""
+        with self._lock:
+            first, last = event['U'], event['u']
+            if last <= self.last_update_id:
+                return True  # already covered by the snapshot
+            if self.synced:
+                if first != self.last_update_id + 1:
+                    return False
+            elif not first <= self.last_update_id + 1 <= last:
+                return False
+
+            for price, qty in event['b']:
+                self.bids.set(float(price), float(qty))
+            for price, qty in event['a']:
+                self.asks.set(float(price), float(qty))
+            self.last_update_id = last
+            self.synced = True
+            return True
+
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best()
+
+    def top(self) -> Optional[Tuple[float, float, float, float]]:
+        """(bid, bid qty, ask, ask qty) read under the lock; None while either side is empty"""
+        with self._lock:
+            if not self.bids.keys or not self.asks.keys:
+                return None
+            return -self.bids.keys[0], self.bids.qtys[0], self.asks.keys[0], self.asks.qtys[0]
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def estimate(self, side: str, quantity: float) -> ImpactEstimate:
+        """Expected fill for a market order of quantity taking liquidity on side"""
+        book_side = self.asks if side.upper() == 'BUY' else self.bids
+        with self._lock:
+            best = book_side.best() or 0.0
+            filled, notional, worst, levels = book_side.walk(quantity)
+        avg = notional / filled if filled else 0.0
+        return ImpactEstimate(side.upper(), quantity, filled, avg, worst, best, levels)
+
+    def levels(self, side: str, depth: int = 20) -> List[tuple]:
+        """(price, qty) of the first depth levels a market order on side would take"""
+        book_side = self.asks if side.upper() == 'BUY' else self.bids
+        with self._lock:
+            return [(key * book_side.sign, qty) for key, qty in zip(book_side.keys[:depth], book_side.qtys[:depth])]
+
+    def max_quantity(self, side: str, max_slippage_bps: float) -> float:
+        """Largest quantity whose every fill is within max_slippage_bps of the best price"""
+        book_side = self.asks if side.upper() == 'BUY' else self.bids
+        with self._lock:
+            best = book_side.best()
+            if best is None:
+                return 0.0
+            factor = max_slippage_bps / 10_000
+            limit = best * (1 + factor) if book_side.sign > 0 else best * (1 - factor)
+            return book_side.depth_within(limit)
+
+
+class DepthBookManager:
+    """Keeps OrderBooks for several symbols in sync with the diff-depth stream.
+
+    Follows Binance's procedure: buffer stream events, fetch a REST
+    snapshot, drop events it already covers, then apply the rest in
+    sequence. A gap in update ids hands the symbol to a resync thread, so
+    the stream callback never waits on a REST call; each resync makes a
+    bounded number of snapshot attempts with backoff. Listeners are called
+    on the stream thread after each applied event with the book and the
+    perf_counter_ns at which the message was received.
+    """
+
+    def __init__(self, client, symbols: List[str], testnet: bool = True) -> None:
+        self.client = client
+        self.books: Dict[str, OrderBook] = {s: OrderBook(s) for s in symbols}
+        self._buffers: Dict[str, Optional[list]] = {s: [] for s in symbols}
+        self._testnet = testnet
+        self._twm = None
+        self._lock = threading.Lock()
+        self._resync_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._resync_pending = set()
+        self._gave_up: Dict[str, float] = {}
+        self._resync_thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[OrderBook, int], None]] = []
+
+    def add_listener(self, callback: Callable[[OrderBook, int], None]) -> None:
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[OrderBook, int], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        book = self.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def _resync(self, symbol: str) -> bool:
+        """Snapshot plus buffered replay, retried with backoff; False if every attempt failed"""
+        book = self.books[symbol]
+        with self._lock:
+            if self._buffers[symbol] is None:
+                self._buffers[symbol] = []
+
+        for attempt in range(RESYNC_ATTEMPTS):
+            if attempt:
+                time.sleep(min(RESYNC_BACKOFF * 2 ** (attempt - 1), RESYNC_BACKOFF_MAX))
+            try:
+                snapshot = self.client.get_order_book(symbol=symbol, limit=SNAPSHOT_LIMIT)
+            except Exception as e:
+                logger.error(f"Depth snapshot failed for {symbol}: {str(e)}")
+                continue
+
+            with self._lock:
+                book.apply_snapshot(snapshot)
+                buffered = self._buffers[symbol]
+                # keep the buffer on failure: a newer snapshot may still line up with it
+                in_sequence = all(book.apply_diff(event) for event in buffered)
+                if in_sequence:
+                    self._buffers[symbol] = None
+                else:
+                    del buffered[:-BUFFER_LIMIT]
+
+            if in_sequence:
+                self._gave_up.pop(symbol, None)
+                logger.info(f"Order book synced for {symbol} at update {book.last_update_id}")
+                return True
+            logger.warning(f"Depth gap for {symbol} while replaying buffer (attempt {attempt + 1})")
+
+        logger.error(f"Giving up on {symbol} order book after {RESYNC_ATTEMPTS} attempts")
+        with self._lock:
+            self._buffers[symbol] = None
+        self._gave_up[symbol] = time.monotonic()
+        return False
+
+    def _request_resync(self, symbol: str) -> None:
+        gave_up = self._gave_up.get(symbol)
+        if gave_up is not None and time.monotonic() - gave_up < RESYNC_COOLDOWN:
+            return
+        with self._lock:
+            if symbol in self._resync_pending:
+                return
+            self._resync_pending.add(symbol)
+            if self._buffers[symbol] is None:
+                self._buffers[symbol] = []
+        logger.warning(f"Depth gap for {symbol}, resyncing")
+        self._resync_queue.put(symbol)
+
+    def _run_resyncs(self) -> None:
+        while True:
+            symbol = self._resync_queue.get()
+            if symbol is None:
+                return
+            try:
+                self._resync(symbol)
+            except Exception as e:
+                logger.error(f"Resync of {symbol} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._resync_pending.discard(symbol)
+
+    def _handle(self, msg: dict) -> None:
+        received_ns = time.perf_counter_ns()
+        data = msg.get('data', msg)
+        if data.get('e') == 'error':
+            logger.error(f"Depth stream error: {data.get('m')}")
+            return
+        symbol = data.get('s')
+        if symbol not in self.books:
+            return
+
+        with self._lock:
+            buffer = self._buffers[symbol]
+            if buffer is not None:
+                buffer.append(data)
+                if len(buffer) > 2 * BUFFER_LIMIT:
+                    del buffer[:-BUFFER_LIMIT]
+                return
+            book = self.books[symbol]
+            in_sequence = book.apply_diff(data)
+
+        if not in_sequence:
+            book.synced = False
+            self._request_resync(symbol)
+            return
+        for callback in self._listeners:
+            try:
+                callback(book, received_ns)
+            except Exception as e:
+                logger.error(f"Depth listener failed for {symbol}: {str(e)}")
+
+    def start(self) -> None:
+        """Open the diff-depth streams and load the initial snapshots"""
+        from binance import ThreadedWebsocketManager
+
+        self._resync_thread = threading.Thread(target=self._run_resyncs, name="depth-resync", daemon=True)
+        self._resync_thread.start()
+        self._twm = ThreadedWebsocketManager(testnet=self._testnet)
+        self._twm.start()
+        streams = [f"{symbol.lower()}@depth@100ms" for symbol in self.books]
+        self._twm.start_multiplex_socket(callback=self._handle, streams=streams)
+        for symbol in self.books:
+            self._resync(symbol)
+
+    def stop(self) -> None:
+        if self._twm is not None:
+            self._twm.stop()
+            self._twm = None
+        if self._resync_thread is not None:
+            self._resync_queue.put(None)
+            self._resync_thread = None
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from logger import logger
+
+
+@dataclass(slots=True)
+class RebalanceTrade:
+    symbol: str
+    side: str
+    quantity: float
+    price: float
+
+    @property
+    def notional(self) -> float:
+        return self.quantity * self.price
+
+
+class Rebalancer:
+    """Move a spot portfolio to target weights with as few API calls as possible.
+
+    Balances, prices and exchange filters are each fetched in one call, the
+    trade list is computed with array arithmetic, and orders are sent in two
+    parallel waves: sells first to free quote balance, then buys.
+    """
+
+    def __init__(self, bot, quote: str = 'USDT', tolerance: float = 0.005,
+                 fee_buffer: float = 0.002, max_workers: int = 8) -> None:
+        self.bot = bot
+        self.quote = quote
+        self.tolerance = tolerance
+        self.fee_buffer = fee_buffer
+        self.max_workers = max_workers
+
+    def plan(self, targets: Dict[str, float]) -> List[RebalanceTrade]:
+        """Trades that bring each target asset to its weight of total equity.
+
+        targets maps asset -> weight (e.g. {"BTC": 0.5, "ETH": 0.3}). Equity
+        counts every balance with a quote-asset price; holdings not in targets
+        are valued but never traded, and the rest of the weight stays in them
+        and in the quote asset.
+        """
+        weights_total = sum(targets.values())
+        if any(w < 0 for w in targets.values()) or weights_total > 1 + 1e-9:
+            raise ValueError("Target weights must be non-negative and sum to at most 1")
+
+        symbol_info = self.bot.symbol_info()
+
+        balances = self.bot.get_account_balance()
+        prices = {t['symbol']: float(t['price']) for t in self.bot.client.get_symbol_ticker()}
+
+        assets = [a for a in targets if a != self.quote]
+        symbols = [f"{a}{self.quote}" for a in assets]
+        missing = [s for s in symbols if s not in symbol_info or s not in prices]
+        if missing:
+            raise ValueError(f"No {self.quote} market for: {', '.join(missing)}")
+
+        self.bot.cache_prices({s: prices[s] for s in symbols})
+
+        price = np.array([prices[s] for s in symbols])
+        held = np.array([float(balances[a].total) if a in balances else 0.0 for a in assets])
+        free = np.array([float(balances[a].free) if a in balances else 0.0 for a in assets])
+        weight = np.array([targets[a] for a in assets])
+        filters = np.array([self.bot.symbol_filters(s) for s in symbols]).reshape(-1, 3)
+        step, min_qty, min_notional = filters[:, 0], filters[:, 1], filters[:, 2]
+
+        quote_balance = balances.get(self.quote)
+        quote_free = float(quote_balance.free) if quote_balance else 0.0
+        equity = float(quote_balance.total) if quote_balance else 0.0
+        equity += float(held @ price)
+        equity += sum(
+            float(balance.total) * prices[f"{asset}{self.quote}"]
+            for asset, balance in balances.items()
+            if asset != self.quote and asset not in targets and f"{asset}{self.quote}" in prices
+        )
+        if equity <= 0:
+            return []
+
+        delta_value = weight * equity - held * price
+        delta_value[np.abs(delta_value) < self.tolerance * equity] = 0.0
+        qty = np.abs(delta_value) / price
+        selling = delta_value < 0
+        qty = np.where(selling, np.minimum(qty, free), qty)
+
+        # buys may only spend what is free after the sells, less a fee buffer
+        sell_proceeds = float((qty * price)[selling].sum())
+        buy_budget = (quote_free + sell_proceeds) * (1 - self.fee_buffer)
+        buy_value = float((qty * price)[~selling].sum())
+        if buy_value > buy_budget:
+            qty = np.where(selling, qty, qty * (max(buy_budget, 0.0) / buy_value))
+
+        qty = np.where(step > 0, np.floor(qty / np.where(step > 0, step, 1) + 1e-9) * step, qty)
+        keep = (qty > 0) & (qty >= min_qty) & (qty * price >= min_notional)
+
+        trades = []
+        for i in np.flatnonzero(keep):
+            decimals = max(0, -int(np.floor(np.log10(step[i])))) if step[i] > 0 else 8
+            trades.append(RebalanceTrade(
+                symbol=symbols[i],
+                side='SELL' if selling[i] else 'BUY',
+                quantity=round(float(qty[i]), decimals),
+                price=float(price[i]),
+            ))
+
+        trades.sort(key=lambda t: t.side != 'SELL')
+        logger.info(
+            f"Rebalance plan: {len(trades)} trades on equity {equity:.2f} {self.quote} "
+            f"({sum(t.side == 'SELL' for t in trades)} sells, {sum(t.side == 'BUY' for t in trades)} buys)"
+        )
+        return trades
+
+    def _submit_wave(self, trades: List[RebalanceTrade]) -> List[Tuple[RebalanceTrade, bool, Any]]:
+        if not trades:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(
+                lambda t: self.bot.place_order(t.symbol, t.side, "MARKET", t.quantity),
+                trades
+            )
+            return [(trade, success, response) for trade, (success, response) in zip(trades, results)]
+
+    def execute(self, trades: List[RebalanceTrade]) -> List[Tuple[RebalanceTrade, bool, Any]]:
+        """Send sells in parallel, then buys in parallel.
+
+        Prices are re-seeded first so risk checks do not depend on the plan's
+        cache entries still being fresh after the confirmation prompt.
+        """
+        symbols = {t.symbol for t in trades}
+        if symbols:
+            self.bot.cache_prices({
+                t['symbol']: float(t['price'])
+                for t in self.bot.client.get_symbol_ticker() if t['symbol'] in symbols
+            })
+        results = self._submit_wave([t for t in trades if t.side == 'SELL'])
+        results += self._submit_wave([t for t in trades if t.side == 'BUY'])
+
+        failed = sum(1 for _, success, _ in results if not success)
+        logger.info(f"Rebalance executed: {len(results) - failed}/{len(results)} orders succeeded")
+        return results
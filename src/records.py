@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List
+
+
+def to_decimal(value: Any) -> Decimal:
+    """Parse an API number (usually a string) without going through float"""
+    if value is None or value == '':
+        return Decimal(0)
+    return Decimal(str(value))
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    order_id: int
+    symbol: str
+    side: str
+    type: str
+    orig_qty: Decimal
+    executed_qty: Decimal
+    price: Decimal
+    status: str
+    time: int
+
+    @classmethod
+    def from_api(cls, order: Dict[str, Any]) -> 'OrderRecord':
+        return cls(
+            order_id=order['orderId'],
+            symbol=order['symbol'],
+            side=order['side'],
+            type=order['type'],
+            orig_qty=to_decimal(order['origQty']),
+            executed_qty=to_decimal(order.get('executedQty')),
+            price=to_decimal(order.get('price')),
+            status=order['status'],
+            time=order['time'],
+        )
+
+    @property
+    def remaining_qty(self) -> Decimal:
+        return self.orig_qty - self.executed_qty
+
+    @property
+    def notional(self) -> Decimal:
+        return self.remaining_qty * self.price
+
+
+@dataclass(slots=True)
+class FillRecord:
+    trade_id: int
+    order_id: int
+    symbol: str
+    side: str
+    qty: Decimal
+    price: Decimal
+    commission: Decimal
+    commission_asset: str
+    time: int
+
+    @classmethod
+    def from_api(cls, trade: Dict[str, Any]) -> 'FillRecord':
+        return cls(
+            trade_id=trade['id'],
+            order_id=trade['orderId'],
+            symbol=trade['symbol'],
+            side='BUY' if trade['isBuyer'] else 'SELL',
+            qty=to_decimal(trade['qty']),
+            price=to_decimal(trade['price']),
+            commission=to_decimal(trade['commission']),
+            commission_asset=trade['commissionAsset'],
+            time=trade['time'],
+        )
+
+    @property
+    def notional(self) -> Decimal:
+        return self.qty * self.price
+
+
+@dataclass(slots=True)
+class BalanceRecord:
+    asset: str
+    free: Decimal
+    locked: Decimal
+
+    @classmethod
+    def from_api(cls, balance: Dict[str, Any]) -> 'BalanceRecord':
+        return cls(
+            asset=balance['asset'],
+            free=to_decimal(balance['free']),
+            locked=to_decimal(balance['locked']),
+        )
+
+    @property
+    def total(self) -> Decimal:
+        return self.free + self.locked
+
+
+class RecordTable:
+    """Sequence of records parsed once, with column views for aggregation"""
+    __slots__ = ('rows',)
+
+    record_type: type = object
+
+    def __init__(self, rows: List[Any]) -> None:
+        self.rows = rows
+
+    @classmethod
+    def from_api(cls, items: List[Dict[str, Any]]) -> 'RecordTable':
+        parse = cls.record_type.from_api
+        return cls([parse(item) for item in items])
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one field, in row order"""
+        return list(map(attrgetter(name), self.rows))
+
+    def where(self, **fields: Any) -> 'RecordTable':
+        """Rows whose fields equal the given values"""
+        getters = [(attrgetter(k), v) for k, v in fields.items()]
+        return self.__class__([r for r in self.rows if all(g(r) == v for g, v in getters)])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __bool__(self) -> bool:
+        return bool(self.rows)
+
+
+class OrderTable(RecordTable):
+    __slots__ = ()
+    record_type = OrderRecord
+
+    def open_notional(self) -> Decimal:
+        """Quote value still resting in the book"""
+        return sum(map(attrgetter('notional'), self.rows), Decimal(0))
+
+    def count_by_symbol(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for symbol in self.column('symbol'):
+            counts[symbol] = counts.get(symbol, 0) + 1
+        return counts
+
+
+class FillTable(RecordTable):
+    __slots__ = ()
+    record_type = FillRecord
+
+    def total_qty(self) -> Decimal:
+        return sum(self.column('qty'), Decimal(0))
+
+    def total_notional(self) -> Decimal:
+        return sum(map(attrgetter('notional'), self.rows), Decimal(0))
+
+    def vwap(self) -> Decimal:
+        """Volume-weighted average fill price, 0 when there are no fills"""
+        qty = self.total_qty()
+        return self.total_notional() / qty if qty else Decimal(0)
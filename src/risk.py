@@ -0,0 +1,252 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Union
+from logger import logger
+
+OrderKey = Union[int, str]
+
+
+@dataclass(slots=True)
+class RiskLimits:
+    """Pre-trade limits; None disables a limit. Notional values are in quote currency."""
+    max_order_notional: Optional[float] = None
+    max_symbol_notional: Optional[float] = None
+    max_gross_exposure: Optional[float] = None
+    max_open_orders: Optional[int] = None
+    max_daily_loss: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+    @classmethod
+    def from_config(cls, config) -> 'RiskLimits':
+        return cls(
+            max_order_notional=getattr(config, 'risk_max_order_notional', None),
+            max_symbol_notional=getattr(config, 'risk_max_symbol_notional', None),
+            max_gross_exposure=getattr(config, 'risk_max_gross_exposure', None),
+            max_open_orders=getattr(config, 'risk_max_open_orders', None),
+            max_daily_loss=getattr(config, 'risk_max_daily_loss', None),
+        )
+
+
+@dataclass(slots=True)
+class _SymbolState:
+    position: float = 0.0
+    avg_cost: float = 0.0
+    reserved: float = 0.0      # notional of open orders not yet filled
+    last_price: float = 0.0
+    exposure: float = 0.0      # |position| * last_price + reserved
+
+
+@dataclass(slots=True)
+class _OpenOrder:
+    symbol: str
+    side: str
+    remaining: float
+    price: float
+
+
+class RiskEngine:
+    """In-memory pre-trade risk state, updated from order acks and fills.
+
+    Every figure a check needs (per-symbol exposure, gross exposure, open
+    order count, realised loss for the day) is kept as a running total, so
+    check() is a handful of dict lookups and comparisons with no API call.
+    Positions include fills seen by this process since it started, plus
+    coins already held at startup (seed_holdings): those are moved into a
+    symbol's position, at the price of the time, when a sell needs them,
+    so selling existing holdings counts as reducing rather than shorting.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None) -> None:
+        self.limits = limits or RiskLimits()
+        self.symbols: Dict[str, _SymbolState] = {}
+        self.open_orders: Dict[OrderKey, _OpenOrder] = {}
+        self.gross_exposure = 0.0
+        self.realized_pnl = 0.0
+        self._day = self._today()
+        self._seen_trades = set()
+        self._seen_fifo = deque()
+        self.bases: Dict[str, str] = {}       # symbol -> base asset
+        self.holdings: Dict[str, float] = {}  # startup holdings not yet in a position, by asset
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def set_bases(self, bases: Dict[str, str]) -> None:
+        """Base asset of each symbol, so sells can draw on startup holdings"""
+        with self._lock:
+            self.bases = dict(bases)
+
+    def seed_holdings(self, free: Dict[str, float]) -> bool:
+        """Record free balances held before any order of this process; only the first call counts"""
+        with self._lock:
+            if self._seeded:
+                return False
+            self._seeded = True
+            self.holdings = {asset: qty for asset, qty in free.items() if qty > 0}
+        logger.debug(f"Risk holdings seeded for {len(self.holdings)} assets")
+        return True
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _state(self, symbol: str) -> _SymbolState:
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = _SymbolState()
+        return state
+
+    def _refresh(self, state: _SymbolState) -> None:
+        exposure = abs(state.position) * state.last_price + state.reserved
+        self.gross_exposure += exposure - state.exposure
+        state.exposure = exposure
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            logger.info(f"Risk day rollover: realised PnL {self.realized_pnl:.2f} reset")
+            self._day = today
+            self.realized_pnl = 0.0
+
+    def _claim_holdings(self, symbol: str, state: _SymbolState, quantity: float, price: float) -> None:
+        """Move startup holdings of symbol's base into its position, up to what a sell of quantity needs"""
+        base = self.bases.get(symbol)
+        pool = self.holdings.get(base, 0.0) if base else 0.0
+        needed = quantity - max(state.position, 0.0)
+        if pool <= 0 or needed <= 0 or state.position < 0:
+            return
+        claimed = min(pool, needed)
+        self.holdings[base] = pool - claimed
+        total = state.position + claimed
+        state.avg_cost = (state.avg_cost * state.position + price * claimed) / total
+        state.position = total
+        if not state.last_price:
+            state.last_price = price
+        self._refresh(state)
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        state = self.symbols.get(symbol)
+        return state.last_price if state and state.last_price else None
+
+    def check(self, symbol: str, side: str, quantity: float, price: float, resting: bool = False) -> Tuple[bool, str]:
+        """Would this order stay within every limit? Returns (ok, reason)."""
+        limits = self.limits
+        notional = quantity * price
+
+        with self._lock:
+            self._roll_day()
+            if side == 'SELL':
+                state = self._state(symbol)
+                self._claim_holdings(symbol, state, quantity, price)
+            else:
+                state = self.symbols.get(symbol) or _SymbolState()
+            signed = quantity if side == 'BUY' else -quantity
+            reducing = bool(state.position) and (state.position > 0) != (signed > 0) and quantity <= abs(state.position)
+
+            if limits.max_order_notional is not None and notional > limits.max_order_notional:
+                return False, f"Order notional {notional:.2f} exceeds limit {limits.max_order_notional:.2f}"
+
+            if limits.max_open_orders is not None and resting and len(self.open_orders) >= limits.max_open_orders:
+                return False, f"Open order limit reached ({limits.max_open_orders})"
+
+            if reducing:
+                return True, "ok"
+
+            if limits.max_daily_loss is not None and -self.realized_pnl >= limits.max_daily_loss:
+                return False, f"Daily loss limit reached ({self.realized_pnl:.2f})"
+
+            new_exposure = abs(state.position + signed) * price + state.reserved + (notional if resting else 0.0)
+            if limits.max_symbol_notional is not None and new_exposure > limits.max_symbol_notional:
+                return False, (
+                    f"{symbol} exposure would be {new_exposure:.2f}, "
+                    f"limit {limits.max_symbol_notional:.2f}"
+                )
+
+            new_gross = self.gross_exposure - state.exposure + new_exposure
+            if limits.max_gross_exposure is not None and new_gross > limits.max_gross_exposure:
+                return False, f"Gross exposure would be {new_gross:.2f}, limit {limits.max_gross_exposure:.2f}"
+
+        return True, "ok"
+
+    def on_price(self, symbol: str, price: float) -> None:
+        with self._lock:
+            state = self._state(symbol)
+            state.last_price = price
+            self._refresh(state)
+
+    def on_ack(self, key: OrderKey, symbol: str, side: str, remaining: float, price: float) -> None:
+        """Reserve notional for an order resting on the book"""
+        if remaining <= 0:
+            return
+        with self._lock:
+            if key in self.open_orders:
+                return
+            self.open_orders[key] = _OpenOrder(symbol, side, remaining, price)
+            state = self._state(symbol)
+            state.reserved += remaining * price
+            if not state.last_price:
+                state.last_price = price
+            self._refresh(state)
+
+    def on_fill(self, key: Optional[OrderKey], symbol: str, side: str, quantity: float, price: float,
+                commission: float = 0.0, trade_id: Optional[int] = None) -> None:
+        """Apply an execution: position, average cost, realised PnL and reservations.
+
+        commission must already be in quote currency (pass 0 when it was
+        paid in another asset). Fills seen twice (REST response and user
+        stream) are ignored by trade_id.
+        """
+        with self._lock:
+            if trade_id is not None:
+                if (symbol, trade_id) in self._seen_trades:
+                    return
+                self._seen_trades.add((symbol, trade_id))
+                self._seen_fifo.append((symbol, trade_id))
+                if len(self._seen_fifo) > 10_000:
+                    self._seen_trades.discard(self._seen_fifo.popleft())
+
+            self._roll_day()
+            state = self._state(symbol)
+            if side == 'SELL':
+                self._claim_holdings(symbol, state, quantity, price)
+            order = self.open_orders.get(key)
+            if order is not None:
+                filled = min(quantity, order.remaining)
+                state.reserved = max(state.reserved - filled * order.price, 0.0)
+                order.remaining -= filled
+                if order.remaining <= 1e-12:
+                    del self.open_orders[key]
+
+            signed = quantity if side == 'BUY' else -quantity
+            position = state.position
+            if position and (position > 0) != (signed > 0):
+                closed = min(abs(signed), abs(position))
+                direction = 1 if position > 0 else -1
+                self.realized_pnl += (price - state.avg_cost) * closed * direction
+                if abs(signed) > abs(position):
+                    state.avg_cost = price
+            else:
+                total = abs(position) + abs(signed)
+                state.avg_cost = (state.avg_cost * abs(position) + price * abs(signed)) / total if total else 0.0
+
+            state.position = position + signed
+            if abs(state.position) < 1e-12:
+                state.position = 0.0
+                state.avg_cost = 0.0
+            self.realized_pnl -= commission
+            state.last_price = price
+            self._refresh(state)
+
+    def on_cancel(self, key: OrderKey) -> None:
+        """Release whatever is still reserved for a cancelled or expired order"""
+        with self._lock:
+            order = self.open_orders.pop(key, None)
+            if order is None:
+                return
+            state = self._state(order.symbol)
+            state.reserved = max(state.reserved - order.remaining * order.price, 0.0)
+            self._refresh(state)
@@ -0,0 +1,300 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from logger import logger
+
+# quote assets treated as interchangeable dollars
+USD_QUOTES = ('USDT', 'FDUSD', 'USDC', 'TUSD', 'BUSD', 'USDP')
+DEFAULT_FEE_RATE = 0.001
+FEE_CACHE_SECONDS = 3600
+
+
+@dataclass(slots=True)
+class RouteLeg:
+    symbol: str
+    quote: str
+    quantity: float
+    price: float            # expected average fill price, in the leg's quote asset
+    fee_rate: float
+    conversion: float       # value of one unit of quote in the router's value asset
+    all_in_price: float     # price after fees and conversion, in the value asset
+
+    @property
+    def notional(self) -> float:
+        return self.quantity * self.all_in_price
+
+
+@dataclass
+class RoutingDecision:
+    base: str
+    side: str
+    quantity: float
+    value_asset: str
+    legs: List[RouteLeg]
+    best_single: Optional[Tuple[str, float]] = None   # (symbol, all-in price) for the whole order on one book
+    unrouted: float = 0.0   # quantity beyond visible depth or free balances, left unsent
+    results: List[Tuple[RouteLeg, bool, Any]] = field(default_factory=list)
+
+    @property
+    def routed_quantity(self) -> float:
+        return sum(leg.quantity for leg in self.legs)
+
+    @property
+    def all_in_price(self) -> float:
+        qty = self.routed_quantity
+        return sum(leg.notional for leg in self.legs) / qty if qty else 0.0
+
+    @property
+    def savings_bps(self) -> float:
+        """Improvement of the split over sending everything to the best single book"""
+        if not self.best_single or not self.best_single[1] or not self.legs:
+            return 0.0
+        single = self.best_single[1]
+        diff = single - self.all_in_price if self.side == 'BUY' else self.all_in_price - single
+        return diff / single * 10_000
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.side} {self.routed_quantity} {self.base} across {len(self.legs)} books, "
+            f"all-in {self.all_in_price:.8f} {self.value_asset}"
+            + (f" ({self.savings_bps:.1f} bps better than {self.best_single[0]} alone)" if self.best_single else "")
+        ]
+        if self.unrouted > 0:
+            lines.append(
+                f"  {self.unrouted} of {self.quantity} {self.base} is not routed "
+                f"(beyond visible depth or free balances)"
+            )
+        for leg in self.legs:
+            lines.append(
+                f"  {leg.symbol:<12} {leg.quantity:>14.8f} @ {leg.price:.8f} {leg.quote} "
+                f"(fee {leg.fee_rate * 100:.3f}%, conv {leg.conversion:.6f}, all-in {leg.all_in_price:.8f})"
+            )
+        return "\n".join(lines)
+
+
+class SmartOrderRouter:
+    """Split a market order for one base asset across its dollar-quoted books.
+
+    Candidate books come from the bot's cached exchange info. Each book
+    contributes its local depth levels when the bot keeps an order book
+    for it, otherwise its top of book from one bookTicker call. Levels
+    from every book are ranked by all-in price (taker fee plus the cost
+    of converting the quote asset to value_asset at the conversion book's
+    touch) and filled greedily; child orders are then sent in parallel.
+    No conversion orders are sent: a buy leg is only funded from the free
+    balance of its own quote asset (a sell from the free base balance),
+    read with one balance call. Quantity beyond the visible depth of every
+    book or beyond those balances is left out of the legs and reported as
+    RoutingDecision.unrouted.
+    """
+
+    def __init__(self, bot, value_asset: str = 'USDT', quotes: Tuple[str, ...] = USD_QUOTES,
+                 fee_rate: float = DEFAULT_FEE_RATE, depth: int = 20, max_workers: int = 4) -> None:
+        self.bot = bot
+        self.value_asset = value_asset
+        self.quotes = quotes
+        self.fee_rate = fee_rate
+        self.depth = depth
+        self.max_workers = max_workers
+        self._fees: Dict[str, Tuple[float, float]] = {}
+
+    def venues(self, base: str) -> List[str]:
+        """Trading symbols for base quoted in one of the dollar quote assets"""
+        return sorted(
+            symbol for symbol, info in self.bot.symbol_info().items()
+            if info.get('baseAsset') == base and info.get('quoteAsset') in self.quotes
+            and info.get('status', 'TRADING') == 'TRADING'
+        )
+
+    def _taker_fee(self, symbol: str) -> float:
+        cached = self._fees.get(symbol)
+        if cached and time.monotonic() - cached[1] < FEE_CACHE_SECONDS:
+            return cached[0]
+        try:
+            response = self.bot.client.v3_get_account_commission(symbol=symbol)
+            fee = float(response['standardCommission']['taker'])
+        except Exception as e:
+            logger.debug(f"Commission lookup failed for {symbol}, using {self.fee_rate}: {str(e)}")
+            fee = self.fee_rate
+        self._fees[symbol] = (fee, time.monotonic())
+        return fee
+
+    def _conversion_symbol(self, quote: str) -> Optional[Tuple[str, bool]]:
+        """(symbol, inverted) of the book that converts quote to the value asset"""
+        info = self.bot.symbol_info()
+        if f"{quote}{self.value_asset}" in info:
+            return f"{quote}{self.value_asset}", False
+        if f"{self.value_asset}{quote}" in info:
+            return f"{self.value_asset}{quote}", True
+        return None
+
+    def _conversion_rate(self, quote: str, side: str, tickers: Dict[str, dict]) -> Optional[float]:
+        """Value-asset cost of one unit of quote when buying (or proceeds when selling)"""
+        if quote == self.value_asset:
+            return 1.0
+        pair = self._conversion_symbol(quote)
+        if pair is None or pair[0] not in tickers:
+            return None
+        symbol, inverted = pair
+        ticker = tickers[symbol]
+        bid, ask = float(ticker['bidPrice']), float(ticker['askPrice'])
+        if not bid or not ask:
+            return None
+        fee = self._taker_fee(symbol)
+        if side == 'BUY':
+            # quote must be bought with the value asset first
+            return (1 / bid if inverted else ask) * (1 + fee)
+        return (1 / ask if inverted else bid) * (1 - fee)
+
+    def _levels(self, symbol: str, side: str, tickers: Dict[str, dict]) -> List[Tuple[float, float]]:
+        book = self.bot.order_book(symbol)
+        if book is not None:
+            levels = book.levels(side, self.depth)
+            if levels:
+                return levels
+        ticker = tickers.get(symbol)
+        if ticker is None:
+            return []
+        price, qty = (ticker['askPrice'], ticker['askQty']) if side == 'BUY' else (ticker['bidPrice'], ticker['bidQty'])
+        return [(float(price), float(qty))] if float(price) > 0 else []
+
+    def plan(self, base: str, side: str, quantity: float) -> RoutingDecision:
+        """Allocate quantity of base across equivalent books by all-in price"""
+        base, side = base.upper(), side.upper()
+        venues = self.venues(base)
+        if not venues:
+            raise ValueError(f"No {'/'.join(self.quotes)} markets for {base}")
+
+        info = self.bot.symbol_info()
+        conversions = {self._conversion_symbol(info[s]['quoteAsset']) for s in venues} - {None}
+        wanted = sorted(set(venues) | {pair[0] for pair in conversions})
+        tickers = {
+            t['symbol']: t
+            for t in self.bot.client.get_orderbook_tickers(symbols=json.dumps(wanted, separators=(',', ':')))
+        }
+
+        buying = side == 'BUY'
+        candidates = []   # (all-in price, symbol, quote price, qty)
+        per_venue = {}
+        for symbol in venues:
+            quote = info[symbol]['quoteAsset']
+            rate = self._conversion_rate(quote, side, tickers)
+            levels = self._levels(symbol, side, tickers)
+            if rate is None or not levels:
+                logger.debug(f"Skipping {symbol}: no price or conversion rate")
+                continue
+            fee = self._taker_fee(symbol)
+            factor = (1 + fee if buying else 1 - fee) * rate
+            per_venue[symbol] = (quote, fee, rate, factor, levels)
+            candidates.extend((price * factor, symbol, price, qty) for price, qty in levels)
+
+        if not candidates:
+            raise ValueError(f"No usable book prices for {base}")
+
+        candidates.sort(key=lambda c: c[0] if buying else -c[0])
+        funds = {asset: float(b.free) for asset, b in self.bot.get_account_balance().items()}
+        allocated: Dict[str, List[float]] = {}   # symbol -> [qty, quote notional, last price]
+        remaining = quantity
+        for _, symbol, price, qty in candidates:
+            if remaining <= 0:
+                break
+            # balance spent per unit of base: quote plus fee when buying, the base itself when selling
+            asset = per_venue[symbol][0] if buying else base
+            cost = price * (1 + per_venue[symbol][1]) if buying else 1.0
+            take = min(qty, remaining, funds.get(asset, 0.0) / cost)
+            if take <= 0:
+                continue
+            funds[asset] = funds.get(asset, 0.0) - take * cost
+            entry = allocated.setdefault(symbol, [0.0, 0.0, price])
+            entry[0] += take
+            entry[1] += take * price
+            entry[2] = price
+            remaining -= take
+
+        ranked = [c[1] for c in candidates]
+        legs = self._legs(allocated, per_venue, ranked, buying)
+        unrouted = max(round(quantity - sum(leg.quantity for leg in legs), 12), 0.0)
+        if unrouted > 0:
+            logger.warning(f"{base} order: {unrouted} not routed (beyond visible depth or free balances)")
+
+        decision = RoutingDecision(
+            base, side, quantity, self.value_asset, legs,
+            best_single=self._best_single(per_venue, quantity, buying), unrouted=unrouted
+        )
+        logger.info(f"Routing plan: {decision.summary()}")
+        return decision
+
+    def _below_minimum(self, symbol: str, qty: float, price: float) -> bool:
+        _, min_qty, min_notional = self.bot.symbol_filters(symbol)
+        return qty <= 0 or qty < min_qty or qty * price < min_notional
+
+    def _legs(self, allocated: Dict[str, List[float]], per_venue: dict, ranked: List[str],
+              buying: bool) -> List[RouteLeg]:
+        """Round allocations to lot sizes; a leg below exchange minimums is folded into the
+        best book paid from the same balance, or dropped if there is none"""
+        allocation = {s: a[0] for s, a in allocated.items()}
+        funding = (lambda s: per_venue[s][0]) if buying else (lambda s: None)
+        rounded: Dict[str, float] = {}
+        while allocation:
+            order = sorted(allocation, key=ranked.index)
+            rounded = {s: self.bot.round_quantity(s, q) for s, q in allocation.items()}
+            too_small = [s for s in reversed(order) if self._below_minimum(s, rounded[s], allocated[s][2])]
+            if not too_small:
+                break
+            symbol = too_small[0]  # worst-ranked first, so it can fold into a better book
+            qty = allocation.pop(symbol)
+            target = next((s for s in order if s in allocation and funding(s) == funding(symbol)), None)
+            if target is not None:
+                allocation[target] += qty
+        else:
+            rounded = {}
+
+        legs = []
+        for symbol in sorted(rounded, key=ranked.index):
+            qty = rounded[symbol]
+            total_qty, notional, _ = allocated[symbol]
+            price = notional / total_qty if total_qty else 0.0
+            quote, fee, rate, factor, _ = per_venue[symbol]
+            legs.append(RouteLeg(symbol, quote, qty, price, fee, rate, price * factor))
+        return legs
+
+    @staticmethod
+    def _best_single(per_venue: dict, quantity: float, buying: bool) -> Optional[Tuple[str, float]]:
+        """Best all-in average for the whole quantity on one book, among books deep enough to price it"""
+        best = None
+        for symbol, (_, _, _, factor, levels) in per_venue.items():
+            remaining, notional = quantity, 0.0
+            for price, qty in levels:
+                take = min(qty, remaining)
+                notional += take * price
+                remaining -= take
+                if remaining <= 0:
+                    break
+            if remaining > 0:
+                continue
+            all_in = notional / quantity * factor
+            if best is None or (all_in < best[1] if buying else all_in > best[1]):
+                best = (symbol, all_in)
+        return best
+
+    def execute(self, decision: RoutingDecision) -> RoutingDecision:
+        """Send every leg as a market order in parallel"""
+        def send(leg: RouteLeg):
+            return self.bot.place_order(leg.symbol, decision.side, "MARKET", leg.quantity)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(send, decision.legs))
+        decision.results = [(leg, success, response) for leg, (success, response) in zip(decision.legs, results)]
+
+        failed = [leg.symbol for leg, success, _ in decision.results if not success]
+        logger.info(
+            f"Routed {decision.side} {decision.base}: {len(decision.results) - len(failed)}/"
+            f"{len(decision.results)} child orders succeeded" + (f" (failed: {', '.join(failed)})" if failed else "")
+        )
+        return decision
+
+    def route(self, base: str, side: str, quantity: float) -> RoutingDecision:
+        """Plan and execute a routed market order"""
+        return self.execute(self.plan(base, side, quantity))
@@ -0,0 +1,55 @@
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Iterator, List
+
+_started = time.perf_counter()
+_phases: List[list] = []  # [depth, name, seconds, modules imported]
+_depth = 0
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module that is only executed on first attribute access"""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a startup step and count the modules it imported"""
+    global _depth
+    start = time.perf_counter()
+    modules = len(sys.modules)
+    entry = [_depth, name, 0.0, 0]
+    _phases.append(entry)
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        entry[2] = time.perf_counter() - start
+        entry[3] = len(sys.modules) - modules
+
+
+def report() -> str:
+    """Startup-time breakdown, nested phases indented under their parent"""
+    lines = [f"{'Phase':<28} {'ms':>10} {'modules':>8}", "-" * 48]
+    for depth, name, elapsed, modules in _phases:
+        label = "  " * depth + name
+        lines.append(f"{label:<28} {elapsed * 1000:>10.1f} {modules:>8}")
+    lines.append("-" * 48)
+    lines.append(f"{'total since start':<28} {(time.perf_counter() - _started) * 1000:>10.1f} {len(sys.modules):>8}")
+    return "\n".join(lines)
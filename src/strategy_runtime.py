@@ -0,0 +1,384 @@
+import argparse
+import heapq
+import importlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from logger import logger
+from market_data import Tick
+
+
+class Strategy:
+    """Base class for strategies run by StrategyRuntime.
+
+    Subclasses set symbols and override the handlers they need. Handlers
+    run on the strategy's own dispatcher thread, one at a time, so a
+    strategy needs no locking for its own state. Orders go through
+    self.bot.place_order and are subject to the usual risk checks.
+    """
+    symbols: Tuple[str, ...] = ()
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name or type(self).__name__
+        self.bot = None
+        self.runtime = None
+
+    def on_start(self) -> None:
+        pass
+
+    def on_tick(self, tick: Tick) -> None:
+        pass
+
+    def on_order_update(self, event: dict) -> None:
+        pass
+
+    def on_timer(self, name: str) -> None:
+        pass
+
+    def on_stop(self) -> None:
+        pass
+
+    def schedule(self, interval: float, name: str = "timer", repeat: bool = True) -> None:
+        """Call on_timer(name) every interval seconds (or once if repeat is False)"""
+        self.runtime.schedule(self, interval, name, repeat)
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    calls: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    samples: deque = field(default_factory=lambda: deque(maxlen=1024))
+
+    def add(self, elapsed_ns: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.samples.append(elapsed_ns)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0
+        return {
+            'calls': self.calls,
+            'mean_us': self.total_ns / self.calls / 1000 if self.calls else 0.0,
+            'p99_us': p99 / 1000,
+            'max_us': self.max_ns / 1000,
+        }
+
+
+class _Inbox:
+    """Pending events for one strategy.
+
+    Ticks are coalesced per symbol (only the latest is kept), order
+    updates and timers are queued in arrival order. The dispatcher takes
+    everything pending in one batch, so the producer side never blocks.
+    """
+
+    def __init__(self) -> None:
+        self.ticks: Dict[str, Tuple[Tick, int]] = {}
+        self.orders: deque = deque()
+        self.timers: deque = deque()
+        self.coalesced = 0
+        self.max_depth = 0
+        self.cond = threading.Condition()
+
+    def depth(self) -> int:
+        return len(self.ticks) + len(self.orders) + len(self.timers)
+
+    def _notify(self) -> None:
+        depth = self.depth()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self.cond.notify()
+
+    def put_tick(self, tick: Tick, received_ns: int) -> None:
+        with self.cond:
+            if tick.symbol in self.ticks:
+                self.coalesced += 1
+            self.ticks[tick.symbol] = (tick, received_ns)
+            self._notify()
+
+    def put_order(self, event: dict) -> None:
+        with self.cond:
+            self.orders.append(event)
+            self._notify()
+
+    def put_timer(self, name: str) -> None:
+        with self.cond:
+            self.timers.append(name)
+            self._notify()
+
+    def take(self, timeout: float):
+        """(orders, ticks, timers) pending, waiting up to timeout for the first event"""
+        with self.cond:
+            if not self.depth():
+                self.cond.wait(timeout)
+            ticks, self.ticks = self.ticks, {}
+            orders, self.orders = self.orders, deque()
+            timers, self.timers = self.timers, deque()
+        return orders, ticks, timers
+
+
+class _Runner:
+    """Dispatcher thread and statistics for one registered strategy"""
+
+    def __init__(self, strategy: Strategy) -> None:
+        self.strategy = strategy
+        self.inbox = _Inbox()
+        self.stats = {kind: HandlerStats() for kind in ('tick', 'order', 'timer')}
+        self.tick_delay = HandlerStats()  # stream receipt -> handler start
+        self.batches = 0
+        self.errors = 0
+        self.thread: Optional[threading.Thread] = None
+
+    def _call(self, kind: str, handler, *args) -> None:
+        start = time.perf_counter_ns()
+        try:
+            handler(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Strategy {self.strategy.name} {kind} handler failed: {str(e)}")
+        if kind in self.stats:
+            self.stats[kind].add(time.perf_counter_ns() - start)
+
+    def run(self, stop: threading.Event) -> None:
+        strategy = self.strategy
+        self._call('start', strategy.on_start)
+        while not stop.is_set():
+            orders, ticks, timers = self.inbox.take(timeout=0.5)
+            if not (orders or ticks or timers):
+                continue
+            self.batches += 1
+            # order state first, so tick handlers see fills that arrived in the same batch
+            for event in orders:
+                self._call('order', strategy.on_order_update, event)
+            for tick, received_ns in ticks.values():
+                self.tick_delay.add(time.perf_counter_ns() - received_ns)
+                self._call('tick', strategy.on_tick, tick)
+            for name in timers:
+                self._call('timer', strategy.on_timer, name)
+        self._call('stop', strategy.on_stop)
+
+    def snapshot(self) -> dict:
+        return {
+            'queue_depth': self.inbox.depth(),
+            'max_queue_depth': self.inbox.max_depth,
+            'coalesced_ticks': self.inbox.coalesced,
+            'batches': self.batches,
+            'errors': self.errors,
+            'tick_delay': self.tick_delay.summary(),
+            **{kind: stats.summary() for kind, stats in self.stats.items()},
+        }
+
+
+class StrategyRuntime:
+    """Event loop that runs many strategies against one TradingBot.
+
+    Each strategy gets its own dispatcher thread and inbox, so a slow
+    handler only delays that strategy's events; the stream callbacks that
+    feed the inboxes do a dict write and return. Ticks come from feed_tick,
+    a listener on the bot's local order books (pushed from the depth stream
+    thread) or, for symbols without a local book, the shared tick book. The
+    shared book lives in another process, so it is polled every
+    poll_interval seconds; its receipt time is taken from the publisher's
+    timestamp, so tick delay still measures stream receipt -> handler start.
+    Order updates come from the bot's user data stream.
+    """
+
+    def __init__(self, bot, poll_interval: float = 0.01) -> None:
+        self.bot = bot
+        self.poll_interval = poll_interval
+        self._runners: Dict[str, _Runner] = {}
+        self._by_symbol: Dict[str, List[_Runner]] = {}
+        self._timers: list = []
+        self._timer_seq = 0
+        self._timer_cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        bot.add_order_listener(self._on_order_event)
+
+    def register(self, strategy: Strategy) -> Strategy:
+        if strategy.name in self._runners:
+            raise ValueError(f"Strategy name already registered: {strategy.name}")
+        strategy.bot = self.bot
+        strategy.runtime = self
+        runner = _Runner(strategy)
+        self._runners[strategy.name] = runner
+        for symbol in strategy.symbols:
+            self._by_symbol.setdefault(symbol.upper(), []).append(runner)
+        if self._threads:
+            self._start_runner(runner)
+        logger.info(f"Registered strategy {strategy.name} on {', '.join(strategy.symbols) or 'no symbols'}")
+        return strategy
+
+    def schedule(self, strategy: Strategy, interval: float, name: str = "timer", repeat: bool = True) -> None:
+        runner = self._runners[strategy.name]
+        with self._timer_cond:
+            self._timer_seq += 1
+            heapq.heappush(self._timers, (time.monotonic() + interval, self._timer_seq, runner, name,
+                                          interval if repeat else None))
+            self._timer_cond.notify()
+
+    def feed_tick(self, tick: Tick, received_ns: Optional[int] = None) -> None:
+        """Deliver a top-of-book update to every strategy subscribed to its symbol.
+
+        received_ns is the perf_counter_ns at which the stream message
+        arrived; it defaults to now. Matches run_publisher's on_tick hook.
+        """
+        runners = self._by_symbol.get(tick.symbol)
+        if runners:
+            if received_ns is None:
+                received_ns = time.perf_counter_ns()
+            for runner in runners:
+                runner.inbox.put_tick(tick, received_ns)
+
+    def _on_book_update(self, book, received_ns: int) -> None:
+        """Depth stream listener: the book's new top of book as a tick"""
+        if book.symbol not in self._by_symbol:
+            return
+        top = book.top()
+        if top is not None:
+            self.feed_tick(Tick(book.symbol, *top, time.time()), received_ns)
+
+    def _on_order_event(self, event: dict) -> None:
+        if event.get('e') != 'executionReport':
+            return
+        for runner in self._by_symbol.get(event.get('s'), ()):
+            runner.inbox.put_order(event)
+
+    def _run_timers(self) -> None:
+        with self._timer_cond:
+            while not self._stop.is_set():
+                if not self._timers:
+                    self._timer_cond.wait(0.5)
+                    continue
+                due, _, runner, name, interval = self._timers[0]
+                now = time.monotonic()
+                if due > now:
+                    self._timer_cond.wait(due - now)
+                    continue
+                heapq.heappop(self._timers)
+                runner.inbox.put_timer(name)
+                if interval is not None:
+                    self._timer_seq += 1
+                    # next slot after now, so a stalled strategy does not get a burst of catch-up timers
+                    next_due = due + interval * max(1, int((now - due) // interval) + 1)
+                    heapq.heappush(self._timers, (next_due, self._timer_seq, runner, name, interval))
+
+    def _poll_shared_ticks(self) -> None:
+        """Turn changes in the cross-process shared tick book into ticks"""
+        books = self.bot.order_books
+        last_seen: Dict[str, float] = {}
+        while not self._stop.wait(self.poll_interval):
+            for symbol in list(self._by_symbol):
+                if books is not None and symbol in books.books:
+                    continue  # pushed by the depth listener
+                tick = self.bot.market_data.read(symbol)
+                if tick is None or last_seen.get(symbol) == tick.update_time:
+                    continue
+                last_seen[symbol] = tick.update_time
+                # the publisher stamped update_time on receipt; map it onto perf_counter_ns
+                age_ns = max(0, int((time.time() - tick.update_time) * 1e9))
+                self.feed_tick(tick, time.perf_counter_ns() - age_ns)
+
+    def _start_runner(self, runner: _Runner) -> None:
+        runner.thread = threading.Thread(
+            target=runner.run, args=(self._stop,), name=f"strategy-{runner.strategy.name}", daemon=True
+        )
+        runner.thread.start()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._run_timers, name="strategy-timers", daemon=True)]
+        if self.bot.order_books is not None:
+            self.bot.order_books.add_listener(self._on_book_update)
+        if self.bot.market_data is not None:
+            self._threads.append(threading.Thread(target=self._poll_shared_ticks, name="strategy-ticks", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        for runner in self._runners.values():
+            self._start_runner(runner)
+        logger.info(f"Strategy runtime started with {len(self._runners)} strategies")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self.bot.order_books is not None:
+            self.bot.order_books.remove_listener(self._on_book_update)
+        with self._timer_cond:
+            self._timer_cond.notify_all()
+        for runner in self._runners.values():
+            with runner.inbox.cond:
+                runner.inbox.cond.notify()
+        for thread in self._threads + [r.thread for r in self._runners.values() if r.thread]:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("Strategy runtime stopped")
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-strategy handler latency, tick delay and queue depth"""
+        return {name: runner.snapshot() for name, runner in self._runners.items()}
+
+    def log_stats(self) -> None:
+        for name, s in self.stats().items():
+            logger.info(
+                f"Strategy {name}: {s['tick']['calls']} ticks "
+                f"(mean {s['tick']['mean_us']:.0f} us, p99 {s['tick']['p99_us']:.0f} us), "
+                f"tick delay p99 {s['tick_delay']['p99_us']:.0f} us, "
+                f"{s['order']['calls']} order updates, {s['timer']['calls']} timers, "
+                f"queue {s['queue_depth']} (max {s['max_queue_depth']}), "
+                f"{s['coalesced_ticks']} ticks coalesced, {s['errors']} errors"
+            )
+
+
+def load_strategy(spec: str) -> Strategy:
+    """Instantiate a strategy from "module:ClassName" """
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Strategy must be given as module:ClassName, got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run strategies against the trading bot")
+    parser.add_argument("strategies", nargs="+", help="strategies to run, as module:ClassName")
+    parser.add_argument("--stats-every", type=float, default=60.0, help="seconds between stats log lines")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="seconds between shared tick book polls")
+    parser.add_argument("--dashboard", action="store_true", help="show the live dashboard while strategies run")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from bot import TradingBot
+
+    args = parse_args()
+    strategies = [load_strategy(spec) for spec in args.strategies]
+    symbols = sorted({s.upper() for strategy in strategies for s in strategy.symbols})
+
+    bot = TradingBot()
+    if symbols:
+        bot.start_order_books(symbols)
+    bot.start_user_stream()
+
+    runtime = StrategyRuntime(bot, poll_interval=args.poll_interval)
+    for strategy in strategies:
+        runtime.register(strategy)
+    runtime.start()
+    try:
+        if args.dashboard:
+            from dashboard import open_dashboard
+            open_dashboard(bot)
+        else:
+            while True:
+                time.sleep(args.stats_every)
+                runtime.log_stats()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runtime.stop()
+        runtime.log_stats()
+        if bot.order_books is not None:
+            bot.order_books.stop()
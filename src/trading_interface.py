@@ -1,16 +1,35 @@
+import argparse
+import startup
 import sys
 import logging
 from datetime import datetime
 from typing import Callable, TypeVar
-from bot import TradingBot
 from logger import logger
 
 T = TypeVar('T')
 
+# menu choice -> TradingInterface method; EXIT_CHOICE leaves the loop
+MENU_ACTIONS = {
+    "1": "_place_order_flow",
+    "2": "_check_balance",
+    "3": "_view_open_orders",
+    "4": "_view_trade_history",
+    "5": "_cancel_order_flow",
+    "6": "_rebalance_flow",
+    "7": "_route_order_flow",
+    "8": "open_dashboard",
+}
+EXIT_CHOICE = "9"
+# full-screen views return straight to the menu without an Enter prompt
+NO_PAUSE = ("8",)
+
 
 class TradingInterface:
-    def __init__(self) -> None:
-        self.bot = TradingBot()
+    def __init__(self, validation: str = "sync") -> None:
+        with startup.phase("import bot"):
+            from bot import TradingBot
+        self.bot = TradingBot(validation=validation)
+        self.dashboard_state = None
         logger.info("Trading interface initialized")
 
     def run(self):
@@ -21,22 +40,13 @@ class TradingInterface:
                 self._display_header()
                 choice = self._get_menu_choice()
 
-                if choice == "1":
-                    self._place_order_flow()
-                elif choice == "2":
-                    self._check_balance()
-                elif choice == "3":
-                    self._view_open_orders()
-                elif choice == "4":
-                    self._view_trade_history()
-                elif choice == "5":
-                    self._cancel_order_flow()
-                elif choice == "6":
+                if choice == EXIT_CHOICE:
                     logger.info("Shutting down trading bot")
                     print("\nGoodbye!")
                     break
-                else:
-                    print("Invalid choice, please try again")
+                getattr(self, MENU_ACTIONS[choice])()
+                if choice in NO_PAUSE:
+                    continue
 
                 input("\n Press Enter to continue...")
             except KeyboardInterrupt:
@@ -61,16 +71,19 @@ class TradingInterface:
         print("│ 3. View Open Orders                        │")
         print("│ 4. View Trade History                      │")
         print("│ 5. Cancel Order                            │")
-        print("│ 6. Exit                                    │")
+        print("│ 6. Rebalance Portfolio                     │")
+        print("│ 7. Smart Route Market Order                │")
+        print("│ 8. Live Dashboard                          │")
+        print("│ 9. Exit                                    │")
         print("└────────────────────────────────────────────┘")
 
     def _get_menu_choice(self) -> str:
         """Get validate menu choice"""
         while True:
-            choice = input("\nEnter your choice (1-6): ").strip()
-            if choice in("1", "2", "3", "4", "5", "6"):
+            choice = input("\nEnter your choice (1-9): ").strip()
+            if choice in MENU_ACTIONS or choice == EXIT_CHOICE:
                 return choice
-            print("Invalid input. Please enter 1-6")
+            print("Invalid input. Please enter 1-9")
 
     def _place_order_flow(self):
         """Complete order placement workflow"""
@@ -310,7 +323,7 @@ class TradingInterface:
             print(f"\n{'Asset':<8} {'Free':>12} {'Locked':>12} {'Total':>12}")
             print("-" * 50)
             for asset, data in balance.items():
-                print(f"{asset:<8} {data['free']:>12.4f} {data['locked']:>12.4f} {data['total']:>12.4f}")
+                print(f"{asset:<8} {data.free:>12.4f} {data.locked:>12.4f} {data.total:>12.4f}")
 
             logger.info(f"Balance checked: {balance}")
         except Exception as e:
@@ -329,9 +342,9 @@ class TradingInterface:
             print(f"\n{'ID':<12} {'Symbol':<8} {'Side':<6} {'Type':<15} {'Qty':<10} {'Price':<10}")
             print("-" * 70)
             for order in orders[:10]:  # Show first 10 orders
-                print(f"{order['orderId']:<12} {order['symbol']:<8} {order['side']:<6} "
-                      f"{order['type']:<10} {order['origQty']:<10.4f} "
-                      f"{order['price']:<10.2f}")
+                print(f"{order.order_id:<12} {order.symbol:<8} {order.side:<6} "
+                      f"{order.type:<10} {order.orig_qty:<10.4f} "
+                      f"{order.price:<10.2f}")
 
             logger.info(f"Viewed {len(orders)} open orders")
         except Exception as e:
@@ -359,11 +372,12 @@ class TradingInterface:
             print(f"\n{'Time':<25} {'Side': <6} {'QTY': <10} {'Price': <10} {'Commission':<12}")
             print("-" * 70)
             for trade in trades:
-                time_str = datetime.fromtimestamp(trade['time']/1000).strftime('%Y-%m-%d %H:%M:%S')
+                time_str = datetime.fromtimestamp(trade.time/1000).strftime('%Y-%m-%d %H:%M:%S')
+                commission = f"{trade.commission} {trade.commission_asset}"
 
-                print(f"{time_str:<20} {trade['side']:<6} "
-                      f"{trade['qty']:<10.4f} {trade['price']:10.2f} "
-                      f"{trade['commission']:<12}")
+                print(f"{time_str:<20} {trade.side:<6} "
+                      f"{trade.qty:<10.4f} {trade.price:10.2f} "
+                      f"{commission:<12}")
             logger.info(f"Viewed trade history for {symbol}")
         except Exception as e:
             print(f"\nError fetching trade history: {str(e)}")
@@ -398,12 +412,142 @@ class TradingInterface:
             logger.error(f"Cancel order failed: {str(e)}")
 
 
+    def _rebalance_flow(self):
+        """Rebalance the portfolio to target weights"""
+        from rebalance import Rebalancer
+
+        print("\n---------- REBALANCE PORTFOLIO ---------------")
+        try:
+            quote = input("Quote asset (default USDT): ").strip().upper() or "USDT"
+            raw = input("Target weights of total equity (e.g. BTC=0.4,ETH=0.3): ").strip().upper()
+            targets = {}
+            for part in raw.split(","):
+                if not part.strip():
+                    continue
+                asset, _, weight = part.partition("=")
+                targets[asset.strip()] = float(weight)
+            if not targets:
+                print("No targets given")
+                return
+
+            rebalancer = Rebalancer(self.bot, quote=quote)
+            trades = rebalancer.plan(targets)
+            if not trades:
+                print("\nPortfolio already within tolerance of targets")
+                return
+
+            print(f"\n{'Symbol':<12} {'Side':<6} {'Qty':>14} {'Price':>12} {'Notional':>12}")
+            print("-" * 60)
+            for trade in trades:
+                print(f"{trade.symbol:<12} {trade.side:<6} {trade.quantity:>14.6f} "
+                      f"{trade.price:>12.4f} {trade.notional:>12.2f}")
+
+            if not self._get_yes_no("\nSubmit these orders? (y/n): "):
+                return
+
+            for trade, success, response in rebalancer.execute(trades):
+                status = "OK" if success else f"FAILED: {response}"
+                print(f"{trade.side} {trade.quantity} {trade.symbol}: {status}")
+        except ValueError as e:
+            print(f"\nInvalid rebalance request: {str(e)}")
+        except Exception as e:
+            print(f"\nError rebalancing: {str(e)}")
+            logger.error(f"Rebalance failed: {str(e)}")
+
+    def _route_order_flow(self):
+        """Split a market order across equivalent USD-quoted books"""
+        from router import SmartOrderRouter
+
+        print("\n---------- SMART ROUTE ORDER ---------------")
+        try:
+            base = input("Base asset (e.g. BTC): ").strip().upper()
+            side = self._get_valid_input(
+                prompt="Side (BUY/SELL): ",
+                validator=lambda x: x.upper() in ("BUY", "SELL"),
+                error_msg="Invalid side. Choose BUY or SELL"
+            ).upper()
+            quantity = float(self._get_valid_input(
+                prompt="Enter quantity: ",
+                validator=lambda x: x.replace('.', '', 1).isdigit() and float(x) > 0,
+                error_msg="Quantity must be a positive number"
+            ))
+
+            router = SmartOrderRouter(self.bot)
+            decision = router.plan(base, side, quantity)
+            print(f"\n{decision.summary()}")
+            if not decision.legs:
+                print("\nNothing to route")
+                return
+
+            if not self._get_yes_no("\nSend these orders? (y/n): "):
+                return
+
+            for leg, success, response in router.execute(decision).results:
+                status = f"OK (order {response.get('orderId', 'N/A')})" if success and isinstance(response, dict) \
+                    else ("OK" if success else f"FAILED: {response}")
+                print(f"{leg.symbol}: {leg.quantity} {status}")
+        except ValueError as e:
+            print(f"\nCannot route order: {str(e)}")
+        except Exception as e:
+            print(f"\nError routing order: {str(e)}")
+            logger.error(f"Smart route failed: {str(e)}")
+
+
+    def open_dashboard(self):
+        """Live view of balances, orders, TWAPs and fills from the user data stream"""
+        from dashboard import open_dashboard
+
+        self.dashboard_state = open_dashboard(self.bot, self.dashboard_state)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Binance spot trading bot")
+    parser.add_argument(
+        "--validate",
+        choices=("sync", "async", "skip"),
+        default="sync",
+        help="check API connectivity before the menu (sync), in the background (async) or not at all (skip)"
+    )
+    parser.add_argument(
+        "--order-books",
+        metavar="SYMBOLS",
+        help="comma-separated symbols to keep local depth books for (enables pre-trade impact checks)"
+    )
+    parser.add_argument(
+        "--user-stream",
+        action="store_true",
+        help="stream execution reports so resting orders update risk state as they fill"
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="open the live dashboard instead of the menu (starts the user data stream)"
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print a startup-time breakdown before showing the menu"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
         logger.info("\n" + "-" * 100)
         logger.info("Starting trading interface")
-        interface = TradingInterface()
-        interface.run()
+        interface = TradingInterface(validation=args.validate)
+        if args.order_books:
+            interface.bot.start_order_books([s.strip().upper() for s in args.order_books.split(",") if s.strip()])
+        if args.user_stream:
+            interface.bot.start_user_stream()
+        if args.startup_profile:
+            print(startup.report())
+            input("\nPress Enter to continue...")
+        if args.dashboard:
+            interface.open_dashboard()
+        else:
+            interface.run()
     except Exception as e:
         logger.critical(f"Application crashed: {str(e)}")
         print(f"\nCritical error: {str(e)}")
@@ -0,0 +1,43 @@
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from logger import logger  # noqa: E402
+
+# keep test runs out of the tracked bot.log
+for handler in list(logger.handlers):
+    if isinstance(handler, logging.FileHandler):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+BTCUSDT_INFO = {"symbols": [{"symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT"}]}
+
+
+@pytest.fixture
+def make_bot():
+    """Factory for a TradingBot with settings overridden by keyword and a fake client"""
+    from bot import TradingBot
+
+    def factory(client=None, exchange_info=None, **settings):
+        config = SimpleNamespace(
+            credentials={"api_key": "k", "api_secret": "s", "base_url": ""},
+            max_slippage_bps=None, impact_action="warn", impact_split_minutes=5.0, impact_max_slices=20,
+            risk_max_order_notional=None, risk_max_symbol_notional=None, risk_max_gross_exposure=None,
+            risk_max_daily_loss=None, risk_max_open_orders=None,
+        )
+        for name, value in settings.items():
+            if not hasattr(config, name):
+                raise AttributeError(f"Unknown setting {name}")
+            setattr(config, name, value)
+        bot = TradingBot(config=config, exchange_info=exchange_info or BTCUSDT_INFO, validation="skip")
+        bot._client = client
+        bot._user_stream = object()  # stream not needed in tests
+        return bot
+
+    return factory
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from backtest import SimulatedClient, SimulatedOrderError, VirtualClock
+
+MINUTE = 60_000
+
+
+def make_client(rows, **balances):
+    """Client over one-minute BTCUSDT bars given as (open, high, low, close)"""
+    rows = np.array(rows, dtype=float)
+    open_time = np.arange(len(rows), dtype=np.int64) * MINUTE
+    bars = {'BTCUSDT': {
+        'open_time': open_time, 'open': rows[:, 0], 'high': rows[:, 1], 'low': rows[:, 2],
+        'close': rows[:, 3], 'close_time': open_time + MINUTE - 1,
+    }}
+    clock = VirtualClock(0)
+    return SimulatedClient(bars, clock, balances or {'USDT': 10_000.0, 'BTC': 1.0}, fee_rate=0.0), clock
+
+
+def finish(client, clock):
+    clock.advance(len(client.bars['BTCUSDT']['open']) * MINUTE)
+
+
+def fill_price(client, order_id):
+    return float(client.orders[order_id]['fills'][0]['price'])
+
+
+def test_limit_buy_rests_then_fills_at_limit():
+    client, clock = make_client([(100, 101, 99, 100), (100, 100.5, 98.5, 99), (99, 99.5, 98, 98.5)])
+    order = client.order_limit('BTCUSDT', 'BUY', 1, 98.7)
+    assert order['status'] == 'NEW'
+    assert client.locked['USDT'] == pytest.approx(98.7)
+
+    finish(client, clock)
+    assert client.orders[order['orderId']]['status'] == 'FILLED'
+    assert fill_price(client, order['orderId']) == pytest.approx(98.7)
+    assert client.locked['USDT'] == pytest.approx(0)
+    assert client.free['USDT'] == pytest.approx(10_000 - 98.7)
+
+
+def test_limit_buy_gapping_below_fills_at_open():
+    client, clock = make_client([(100, 101, 99, 100), (97, 98, 96, 97)])
+    order = client.order_limit('BTCUSDT', 'BUY', 1, 98)
+    finish(client, clock)
+    assert fill_price(client, order['orderId']) == pytest.approx(97)
+
+
+def test_insufficient_balance_is_rejected():
+    client, _ = make_client([(100, 101, 99, 100)], USDT=50.0)
+    with pytest.raises(SimulatedOrderError):
+        client.order_limit('BTCUSDT', 'BUY', 1, 99)
+
+
+def test_stop_buy_fills_at_stop_not_below_it():
+    client, clock = make_client([(102, 102.2, 101.8, 102), (102.0, 103.0, 101.9, 102.8)])
+    order = client.order('BTCUSDT', 'BUY', 'STOP_LOSS_LIMIT', 1, price=103, stopPrice=102.5)
+    finish(client, clock)
+    assert fill_price(client, order['orderId']) == pytest.approx(102.5)
+
+
+def test_stop_buy_gapping_through_stop_fills_at_open():
+    client, clock = make_client([(102, 102.2, 101.8, 102), (102.8, 103.5, 102.6, 103)])
+    order = client.order('BTCUSDT', 'BUY', 'STOP_LOSS_LIMIT', 1, price=103, stopPrice=102.5)
+    finish(client, clock)
+    assert fill_price(client, order['orderId']) == pytest.approx(102.8)
+
+
+def test_stop_buy_gapping_past_limit_waits_for_limit():
+    client, clock = make_client([
+        (102, 102.2, 101.8, 102), (104, 105, 103.5, 104), (103.8, 104, 103.6, 103.7), (102.9, 103, 102.5, 102.6),
+    ])
+    order = client.order('BTCUSDT', 'BUY', 'STOP_LOSS_LIMIT', 1, price=103, stopPrice=102.5)
+    # settle bar by bar so the trigger and the fill happen in different settle passes
+    for _ in range(4):
+        clock.advance(MINUTE)
+    assert client.orders[order['orderId']]['fills'][0]['price'] == '102.9'
+
+
+def test_triggered_stop_stays_live_across_settles():
+    # the stop trades on bar 1 but the price gaps below the limit; bar 2 never touches
+    # the stop again, only the limit
+    client, clock = make_client([(100, 100.5, 99.5, 100), (94, 95, 93, 94), (96.2, 96.5, 96.1, 96.3)])
+    order = client.order('BTCUSDT', 'SELL', 'STOP_LOSS_LIMIT', 1, price=95.5, stopPrice=96)
+    for _ in range(3):
+        clock.advance(MINUTE)
+    assert fill_price(client, order['orderId']) == pytest.approx(96.2)
+
+
+def test_oco_stop_leg_fill_expires_limit_leg_and_releases_reservation():
+    client, clock = make_client([(100, 100.5, 99.5, 100), (99, 99.2, 94, 95)])
+    response = client.order_oco('BTCUSDT', 'SELL', 1, price=110, stopPrice=96, stopLimitPrice=95.5)
+    limit_leg, stop_leg = (r['orderId'] for r in response['orderReports'])
+    assert client.locked['BTC'] == pytest.approx(1)
+
+    finish(client, clock)
+    assert client.orders[stop_leg]['status'] == 'FILLED'
+    assert client.orders[limit_leg]['status'] == 'EXPIRED'
+    assert fill_price(client, stop_leg) == pytest.approx(96)
+    assert client.locked['BTC'] == pytest.approx(0)
+    assert client.free['BTC'] == pytest.approx(0)
+    assert client.free['USDT'] == pytest.approx(10_096)
+
+
+def test_oco_limit_leg_fill_expires_stop_leg():
+    client, clock = make_client([(100, 100.5, 99.5, 100), (105, 111, 104, 110)])
+    response = client.order_oco('BTCUSDT', 'SELL', 1, price=110, stopPrice=96, stopLimitPrice=95.5)
+    limit_leg, stop_leg = (r['orderId'] for r in response['orderReports'])
+    finish(client, clock)
+    assert client.orders[limit_leg]['status'] == 'FILLED'
+    assert client.orders[stop_leg]['status'] == 'EXPIRED'
+    assert client.locked['BTC'] == pytest.approx(0)
+
+
+def test_cancelling_oco_stop_leg_releases_shared_reservation():
+    client, _ = make_client([(100, 100.5, 99.5, 100)])
+    response = client.order_oco('BTCUSDT', 'SELL', 1, price=110, stopPrice=96, stopLimitPrice=95.5)
+    stop_leg = response['orderReports'][1]['orderId']
+    client.cancel_order('BTCUSDT', stop_leg)
+    assert all(o['status'] == 'CANCELED' for o in client.orders.values())
+    assert client.locked['BTC'] == pytest.approx(0)
+    assert client.free['BTC'] == pytest.approx(1)
+    assert client.get_open_orders() == []
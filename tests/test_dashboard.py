@@ -0,0 +1,87 @@
+import curses
+import logging
+
+from advanced import twap
+from dashboard import Dashboard
+from logger import logger
+
+
+def console_handlers():
+    return [h for h in logger.handlers
+            if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler)]
+
+
+def test_console_logging_goes_to_panel_while_open(monkeypatch, capsys):
+    before = console_handlers()
+    dashboard = Dashboard(bot=None, state=None)
+
+    def fake_wrapper(loop):
+        assert console_handlers() == []
+        logger.warning("order rejected\ntraceback line")
+
+    monkeypatch.setattr(curses, "wrapper", fake_wrapper)
+    capsys.readouterr()
+    dashboard.run()
+
+    assert "order rejected" not in capsys.readouterr().out
+    assert list(dashboard._log.lines) == ["WARNING  order rejected"]
+    assert console_handlers() == before
+    assert dashboard._log not in logger.handlers
+
+
+def test_twap_snapshot_is_a_copy():
+    progress = {'symbol': 'BTCUSDT', 'done': 0}
+    with twap.running_lock:
+        twap.running[id(progress)] = progress
+    try:
+        snapshot = twap.running_snapshot()
+        progress['done'] = 1
+        assert snapshot == [{'symbol': 'BTCUSDT', 'done': 0}]
+        assert not twap.running_lock.locked()
+    finally:
+        twap.running.pop(id(progress), None)
+
+
+class FakeStreamManager:
+    started = 0
+
+    def __init__(self, **params):
+        pass
+
+    def start(self):
+        FakeStreamManager.started += 1
+
+    def start_user_socket(self, callback):
+        pass
+
+
+def test_dashboard_starts_stream_through_the_bot_lock(make_bot, monkeypatch):
+    import binance
+    import dashboard
+
+    monkeypatch.setattr(binance, "ThreadedWebsocketManager", FakeStreamManager)
+    monkeypatch.setattr(Dashboard, "run", lambda self: None)
+    FakeStreamManager.started = 0
+    bot = make_bot()
+    bot._user_stream = None
+
+    dashboard.open_dashboard(bot, state=object())
+    dashboard.open_dashboard(bot, state=object())
+    assert bot.ensure_user_stream()
+    assert FakeStreamManager.started == 1
+    assert "[live]" in Dashboard(bot, state=None)._header()
+
+
+def test_stream_failure_is_logged_not_raised(make_bot, monkeypatch):
+    import binance
+
+    def failing(**params):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(binance, "ThreadedWebsocketManager", failing)
+    bot = make_bot()
+    bot._user_stream = None
+
+    assert bot.ensure_user_stream() is False
+    assert not bot.user_stream_active
+    assert "[no stream]" in Dashboard(bot, state=None)._header()
@@ -0,0 +1,49 @@
+import os
+
+from log_index import LogIndex
+
+
+def write_lines(path, lines):
+    with open(path, 'a') as f:
+        for line in lines:
+            f.write(f"2025-10-01 09:00:00 | trading_bot | INFO     | {line}\n")
+
+
+def test_updates_write_only_new_segments(tmp_path):
+    log = str(tmp_path / "bot.log")
+    index = LogIndex(log, valid_symbols={'BTCUSDT', 'ETHUSDT'})
+    for n in range(20):
+        write_lines(log, [f"Order placed: BTCUSDT orderId={n}"])
+        assert index.update() == 1
+
+    # trailing segments are merged, so their count stays logarithmic
+    assert len(index.segments) <= 5
+    files = sorted(os.listdir(index.index_dir))
+    assert files == sorted([s['name'] for s in index.segments] + ['meta.json'])
+
+    reloaded = LogIndex(log, valid_symbols={'BTCUSDT', 'ETHUSDT'})
+    assert len(reloaded.offsets) == 20
+    assert reloaded.update() == 0
+    texts = [text for _, text in reloaded.read(reloaded.select(order_id=7))]
+    assert len(texts) == 1 and texts[0].endswith("orderId=7")
+
+
+def test_asset_names_are_not_symbols(tmp_path):
+    log = str(tmp_path / "bot.log")
+    write_lines(log, ["Balance checked: {'ETH': 1, 'WBETH': 2}", "Price for ETHUSDT: 2500"])
+    index = LogIndex(log, valid_symbols={'BTCUSDT', 'ETHUSDT'})
+    index.update()
+    assert index.symbols == ['ETHUSDT']
+    assert len(index.select(symbol='WBETH')) == 0
+
+
+def test_rebuilds_when_symbol_filter_changes(tmp_path):
+    log = str(tmp_path / "bot.log")
+    write_lines(log, ["Balance checked: {'WBETH': 2}"])
+    unvalidated = LogIndex(log)
+    unvalidated.update()
+    assert unvalidated.symbols == ['WBETH']
+
+    validated = LogIndex(log, valid_symbols={'ETHUSDT'})
+    assert validated.update() == 1
+    assert validated.symbols == []
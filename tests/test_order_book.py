@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import pytest
+
+import order_book
+from order_book import DepthBookManager, OrderBook
+
+
+def make_book(bids=(), asks=(), last_update_id=10):
+    book = OrderBook("BTCUSDT")
+    book.apply_snapshot({'lastUpdateId': last_update_id, 'bids': list(bids), 'asks': list(asks)})
+    return book
+
+
+def test_estimate_walks_levels():
+    book = make_book(asks=[("100", "1"), ("101", "2")])
+    estimate = book.estimate("BUY", 2)
+    assert estimate.complete
+    assert estimate.avg_price == pytest.approx(100.5)
+    assert estimate.worst_price == 101
+    assert estimate.levels == 2
+    assert estimate.slippage_bps == pytest.approx(50)
+
+    too_big = book.estimate("BUY", 5)
+    assert not too_big.complete and too_big.filled_qty == 3
+
+
+def test_max_quantity_within_slippage():
+    book = make_book(bids=[("100", "1"), ("99", "4")], asks=[("101", "1"), ("102", "2")])
+    assert book.max_quantity("BUY", 50) == 1
+    assert book.max_quantity("BUY", 100) == 3
+    assert book.max_quantity("SELL", 100) == 5
+    assert make_book().max_quantity("BUY", 100) == 0
+
+
+THIN_INFO = {"symbols": [{"symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT", "filters": [
+    {"filterType": "LOT_SIZE", "stepSize": "0.0001", "minQty": "0.001"},
+    {"filterType": "NOTIONAL", "minNotional": "5"},
+]}]}
+
+
+def impact_bot(make_bot, book, **settings):
+    bot = make_bot(exchange_info=THIN_INFO, max_slippage_bps=5, impact_action="split", **settings)
+    bot.order_books = SimpleNamespace(get=lambda symbol: book)
+    return bot
+
+
+def test_split_is_capped_at_max_slices(make_bot):
+    # 0.0005 BTC within 5 bps would need 2000 slices
+    book = make_book(bids=[("49990", "1")], asks=[("50000", "0.0005"), ("50100", "10")])
+    quantity, slices = impact_bot(make_bot, book)._check_impact("BTCUSDT", "BUY", 1.0)
+    assert slices == 20
+    assert quantity == pytest.approx(1.0)
+
+
+def test_split_slices_are_rounded_to_lot_size(make_bot):
+    book = make_book(bids=[("49990", "1")], asks=[("50000", "0.4"), ("50100", "10")])
+    quantity, slices = impact_bot(make_bot, book)._check_impact("BTCUSDT", "BUY", 1.0)
+    assert slices == 3
+    assert quantity == pytest.approx(0.3333 * 3)
+
+
+def test_split_below_min_qty_falls_back_to_cap(make_bot):
+    book = make_book(bids=[("49990", "1")], asks=[("50000", "0.0005"), ("50100", "10")])
+    # 8 slices of 0.0005 would each be below minQty 0.001
+    assert impact_bot(make_bot, book)._check_impact("BTCUSDT", "BUY", 0.004) == (0.0, 1)
+    # with max slices 2, slices of 0.002 are valid
+    assert impact_bot(make_bot, book, impact_max_slices=2)._check_impact("BTCUSDT", "BUY", 0.004) == (0.004, 2)
+
+
+def test_within_limit_passes_unchanged(make_bot):
+    book = make_book(bids=[("49990", "1")], asks=[("50000", "5")])
+    assert impact_bot(make_bot, book)._check_impact("BTCUSDT", "BUY", 1.0) == (1.0, 1)
+
+
+class SnapshotClient:
+    def __init__(self, *update_ids):
+        self.update_ids = list(update_ids)
+
+    def get_order_book(self, symbol, limit):
+        return {'lastUpdateId': self.update_ids.pop(0), 'bids': [["99", "1"]], 'asks': [["101", "1"]]}
+
+
+def diff(first, last, bids=()):
+    return {'e': 'depthUpdate', 's': 'BTCUSDT', 'U': first, 'u': last, 'b': list(bids), 'a': []}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(order_book, "RESYNC_BACKOFF", 0)
+
+
+def test_resync_replays_buffer_after_snapshot(no_backoff):
+    manager = DepthBookManager(SnapshotClient(10), ["BTCUSDT"])
+    for event in (diff(5, 9), diff(9, 11, [["100", "2"]]), diff(12, 12)):
+        manager._handle(event)
+
+    assert manager._resync("BTCUSDT")
+    book = manager.get("BTCUSDT")
+    assert book is not None and book.last_update_id == 12
+    assert book.best_bid() == 100
+    assert manager._buffers["BTCUSDT"] is None
+
+
+def test_resync_keeps_buffer_until_a_snapshot_lines_up(no_backoff):
+    # the first snapshot is older than the buffered events, the second one matches
+    manager = DepthBookManager(SnapshotClient(10, 19), ["BTCUSDT"])
+    manager._handle(diff(20, 21))
+    assert manager._resync("BTCUSDT")
+    assert manager.get("BTCUSDT").last_update_id == 21
+
+
+def test_resync_gives_up_after_bounded_attempts(no_backoff, monkeypatch):
+    monkeypatch.setattr(order_book, "RESYNC_ATTEMPTS", 2)
+    manager = DepthBookManager(SnapshotClient(10, 10), ["BTCUSDT"])
+    manager._handle(diff(20, 21))
+    assert not manager._resync("BTCUSDT")
+    assert manager.get("BTCUSDT") is None
+    assert manager._buffers["BTCUSDT"] is None
+    assert "BTCUSDT" in manager._gave_up
+
+    # inside the cooldown a new gap does not queue another resync
+    manager._request_resync("BTCUSDT")
+    assert manager._resync_queue.empty()
+
+
+def test_gap_on_stream_queues_resync_without_blocking():
+    manager = DepthBookManager(SnapshotClient(), ["BTCUSDT"])
+    manager.books["BTCUSDT"].apply_snapshot({'lastUpdateId': 10, 'bids': [], 'asks': []})
+    manager._buffers["BTCUSDT"] = None
+    manager._handle(diff(11, 11))
+    assert manager.get("BTCUSDT") is not None
+
+    manager._handle(diff(15, 16))
+    assert manager.get("BTCUSDT") is None
+    assert manager._resync_queue.get_nowait() == "BTCUSDT"
+    # events are buffered for the replay
+    manager._handle(diff(17, 17))
+    assert [e['U'] for e in manager._buffers["BTCUSDT"]] == [17]
@@ -0,0 +1,55 @@
+import pytest
+
+from rebalance import Rebalancer
+
+
+def symbol(name, base):
+    return {"symbol": name, "baseAsset": base, "quoteAsset": "USDT", "status": "TRADING", "filters": [
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+        {"filterType": "NOTIONAL", "minNotional": "5"},
+    ]}
+
+
+EXCHANGE_INFO = {"symbols": [symbol("BTCUSDT", "BTC"), symbol("ETHUSDT", "ETH")]}
+
+
+class FakeClient:
+    def __init__(self, **free):
+        self.free = free
+        self.prices = {"BTCUSDT": 50_000, "ETHUSDT": 3_000}
+        self.orders = []
+
+    def get_account(self, omitZeroBalances):
+        return {"balances": [{"asset": a, "free": str(q), "locked": "0"} for a, q in self.free.items()]}
+
+    def get_symbol_ticker(self):
+        return [{"symbol": s, "price": str(p)} for s, p in self.prices.items()]
+
+    def order_market(self, symbol, side, quantity, **params):
+        self.orders.append((symbol, side, quantity))
+        return {"orderId": len(self.orders), "orderListId": -1, "status": "FILLED", "origQty": quantity,
+                "executedQty": quantity, "fills": []}
+
+
+def test_equity_includes_holdings_outside_the_targets(make_bot):
+    bot = make_bot(FakeClient(USDT=5_000, ETH=1), EXCHANGE_INFO)
+    trades = Rebalancer(bot).plan({"BTC": 0.5})
+    # equity is 5000 USDT + 1 ETH @ 3000; ETH is valued but not traded
+    assert [(t.symbol, t.side) for t in trades] == [("BTCUSDT", "BUY")]
+    assert trades[0].quantity == pytest.approx(0.08)
+
+
+def test_execute_refreshes_prices_for_risk_checks(make_bot):
+    client = FakeClient(USDT=10_000)
+    bot = make_bot(client, EXCHANGE_INFO, risk_max_order_notional=100_000)
+    rebalancer = Rebalancer(bot)
+    trades = rebalancer.plan({"BTC": 0.5})
+
+    # the operator took longer than the price cache lifetime to confirm
+    bot._rest_prices = {symbol: (price, 0.0) for symbol, (price, _) in bot._rest_prices.items()}
+    client.prices["BTCUSDT"] = 51_000
+
+    results = rebalancer.execute(trades)
+    assert [success for _, success, _ in results] == [True]
+    assert client.orders == [("BTCUSDT", "BUY", "0.1")]
+    assert bot.risk.symbols["BTCUSDT"].last_price == 51_000
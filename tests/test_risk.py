@@ -0,0 +1,164 @@
+import pytest
+
+from risk import RiskEngine, RiskLimits
+
+
+def test_order_notional_limit():
+    risk = RiskEngine(RiskLimits(max_order_notional=1000))
+    assert risk.check("BTCUSDT", "BUY", 0.01, 50_000)[0]
+    ok, reason = risk.check("BTCUSDT", "BUY", 0.03, 50_000)
+    assert not ok and "Order notional" in reason
+
+
+def test_resting_orders_reserve_and_cancel_releases():
+    risk = RiskEngine(RiskLimits(max_symbol_notional=1000, max_open_orders=2))
+    risk.on_ack(1, "BTCUSDT", "BUY", 0.01, 50_000)
+    risk.on_ack(2, "BTCUSDT", "BUY", 0.01, 50_000)
+    assert risk.symbols["BTCUSDT"].reserved == pytest.approx(1000)
+    assert not risk.check("BTCUSDT", "BUY", 0.001, 50_000, resting=True)[0]
+
+    risk.on_cancel(1)
+    risk.on_cancel(2)
+    assert risk.open_orders == {}
+    assert risk.symbols["BTCUSDT"].reserved == 0
+    assert risk.gross_exposure == 0
+    assert risk.check("BTCUSDT", "BUY", 0.01, 50_000, resting=True)[0]
+
+
+def test_fill_releases_reservation_and_builds_position():
+    risk = RiskEngine()
+    risk.on_ack(7, "ETHUSDT", "BUY", 2, 3000)
+    risk.on_fill(7, "ETHUSDT", "BUY", 1, 3000, trade_id=1)
+    assert risk.open_orders[7].remaining == pytest.approx(1)
+    risk.on_fill(7, "ETHUSDT", "BUY", 1, 3000, trade_id=2)
+    assert 7 not in risk.open_orders
+    state = risk.symbols["ETHUSDT"]
+    assert state.position == pytest.approx(2)
+    assert state.reserved == 0
+    assert risk.gross_exposure == pytest.approx(6000)
+
+
+def test_duplicate_fills_are_ignored():
+    risk = RiskEngine()
+    risk.on_fill(1, "ETHUSDT", "BUY", 1, 3000, trade_id=9)
+    risk.on_fill(1, "ETHUSDT", "BUY", 1, 3000, trade_id=9)
+    assert risk.symbols["ETHUSDT"].position == pytest.approx(1)
+
+
+def test_realised_loss_blocks_new_risk_but_not_reductions():
+    risk = RiskEngine(RiskLimits(max_daily_loss=100))
+    risk.on_fill(1, "ETHUSDT", "BUY", 2, 3000, trade_id=1)
+    risk.on_fill(2, "ETHUSDT", "SELL", 1, 2850, trade_id=2)
+    assert risk.realized_pnl == pytest.approx(-150)
+    assert not risk.check("ETHUSDT", "BUY", 0.1, 2850)[0]
+    assert risk.check("ETHUSDT", "SELL", 1, 2850)[0]
+
+
+def test_gross_exposure_limit():
+    risk = RiskEngine(RiskLimits(max_gross_exposure=10_000))
+    risk.on_fill(1, "ETHUSDT", "BUY", 3, 3000, trade_id=1)
+    ok, reason = risk.check("BTCUSDT", "BUY", 0.05, 50_000)
+    assert not ok and "Gross exposure" in reason
+
+
+def holding_engine(**limits):
+    risk = RiskEngine(RiskLimits(**limits))
+    risk.set_bases({"BTCUSDT": "BTC", "BTCUSDC": "BTC"})
+    risk.seed_holdings({"BTC": 0.1, "USDT": 5000})
+    return risk
+
+
+def test_selling_startup_holdings_is_reducing():
+    risk = holding_engine(max_symbol_notional=1000)
+    assert risk.check("BTCUSDT", "SELL", 0.05, 50_000)[0]
+    # more than is held would open a short
+    assert not risk.check("BTCUSDT", "SELL", 0.2, 50_000)[0]
+    # without holdings the same sell is a new short
+    assert not RiskEngine(RiskLimits(max_symbol_notional=1000)).check("BTCUSDT", "SELL", 0.05, 50_000)[0]
+
+
+def test_holdings_can_be_sold_after_daily_loss_trips():
+    risk = holding_engine(max_daily_loss=100)
+    risk.on_fill(1, "ETHUSDT", "BUY", 2, 3000, trade_id=1)
+    risk.on_fill(2, "ETHUSDT", "SELL", 2, 2900, trade_id=2)
+    assert not risk.check("BTCUSDT", "BUY", 0.01, 50_000)[0]
+    assert risk.check("BTCUSDT", "SELL", 0.1, 50_000)[0]
+
+
+def test_sold_holdings_do_not_become_a_short():
+    risk = holding_engine()
+    risk.on_fill(1, "BTCUSDC", "SELL", 0.04, 50_000, trade_id=1)
+    risk.on_fill(2, "BTCUSDT", "SELL", 0.06, 50_000, trade_id=2)
+    assert risk.symbols["BTCUSDC"].position == 0
+    assert risk.symbols["BTCUSDT"].position == 0
+    assert risk.holdings["BTC"] == pytest.approx(0)
+    assert risk.gross_exposure == pytest.approx(0)
+    assert risk.realized_pnl == 0
+
+
+def test_only_first_seed_counts():
+    risk = holding_engine()
+    assert not risk.seed_holdings({"BTC": 5})
+    assert risk.holdings["BTC"] == 0.1
+
+
+class FakeClient:
+    def __init__(self):
+        self.ticker_calls = 0
+        self.orders = {}
+
+    def get_account(self, **params):
+        return {"balances": [{"asset": "BTC", "free": "0.1", "locked": "0"}]}
+
+    def get_symbol_ticker(self, symbol):
+        self.ticker_calls += 1
+        return {"symbol": symbol, "price": "50000"}
+
+    def order_limit(self, symbol, side, quantity, price, timeInForce):
+        order_id = len(self.orders) + 1
+        self.orders[order_id] = symbol
+        return {"orderId": order_id, "orderListId": -1, "status": "NEW", "origQty": quantity,
+                "executedQty": "0", "price": price, "fills": []}
+
+    def order_market(self, symbol, side, quantity, **params):
+        return {"orderId": 99, "orderListId": -1, "status": "FILLED", "origQty": quantity,
+                "executedQty": quantity, "fills": []}
+
+    def cancel_order(self, symbol, orderId):
+        return {"orderId": orderId, "orderListId": -1, "status": "CANCELED"}
+
+
+def test_cancel_frees_open_order_slot(make_bot):
+    bot = make_bot(FakeClient(), risk_max_open_orders=1)
+    ok, order = bot.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, price=40_000)
+    assert ok
+    assert not bot.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, price=40_000)[0]
+
+    assert bot.cancel_order("BTCUSDT", order["orderId"])[0]
+    assert bot.risk.open_orders == {}
+    assert bot.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, price=40_000)[0]
+
+
+def test_market_order_check_makes_no_rest_call(make_bot):
+    bot = make_bot(FakeClient(), risk_max_order_notional=1000)
+    ok, reason = bot.place_order("BTCUSDT", "BUY", "MARKET", 0.001)
+    assert not ok and "no local price" in reason
+    assert bot.client.ticker_calls == 0
+
+    bot.cache_prices({"BTCUSDT": 50_000})
+    assert bot.place_order("BTCUSDT", "BUY", "MARKET", 0.001)[0]
+    assert not bot.place_order("BTCUSDT", "BUY", "MARKET", 0.1)[0]
+    assert bot.client.ticker_calls == 0
+
+
+def test_no_limits_skips_pricing(make_bot):
+    bot = make_bot(FakeClient())
+    assert bot.place_order("BTCUSDT", "BUY", "MARKET", 0.001)[0]
+    assert bot.client.ticker_calls == 0
+
+
+def test_bot_seeds_holdings_from_startup_balance(make_bot):
+    bot = make_bot(FakeClient(), risk_max_symbol_notional=1000)
+    bot._validate_connection()
+    bot.cache_prices({"BTCUSDT": 50_000})
+    assert bot.place_order("BTCUSDT", "SELL", "MARKET", 0.05)[0]
@@ -0,0 +1,78 @@
+import pytest
+
+from router import SmartOrderRouter
+
+
+def symbol(name, base, quote):
+    return {"symbol": name, "baseAsset": base, "quoteAsset": quote, "status": "TRADING", "filters": [
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+        {"filterType": "NOTIONAL", "minNotional": "5"},
+    ]}
+
+
+EXCHANGE_INFO = {"symbols": [
+    symbol("BTCUSDT", "BTC", "USDT"), symbol("BTCUSDC", "BTC", "USDC"), symbol("USDCUSDT", "USDC", "USDT"),
+]}
+
+
+class FakeClient:
+    def __init__(self, **free):
+        self.free = free or {"USDT": 1_000_000, "USDC": 1_000_000}
+
+    def get_account(self, omitZeroBalances):
+        return {"balances": [{"asset": a, "free": str(q), "locked": "0"} for a, q in self.free.items()]}
+
+    def get_orderbook_tickers(self, symbols):
+        return [
+            {"symbol": "BTCUSDT", "bidPrice": "49990", "bidQty": "1", "askPrice": "50000", "askQty": "1"},
+            {"symbol": "BTCUSDC", "bidPrice": "49890", "bidQty": "2", "askPrice": "49900", "askQty": "2"},
+            {"symbol": "USDCUSDT", "bidPrice": "1", "bidQty": "1000000", "askPrice": "1", "askQty": "1000000"},
+        ]
+
+    def v3_get_account_commission(self, symbol):
+        return {"standardCommission": {"taker": "0.001"}}
+
+
+def test_symbol_filters_are_public_bot_helpers(make_bot):
+    bot = make_bot(FakeClient(), EXCHANGE_INFO)
+    assert bot.symbol_filters("BTCUSDT") == (0.001, 0.001, 5.0)
+    assert bot.symbol_filters("UNKNOWN") == (0.0, 0.0, 0.0)
+    assert bot.round_quantity("BTCUSDT", 0.12345) == 0.123
+
+
+def test_split_fills_cheapest_book_first(make_bot):
+    decision = SmartOrderRouter(make_bot(FakeClient(), EXCHANGE_INFO)).plan("BTC", "BUY", 2.5)
+    assert [(leg.symbol, leg.quantity) for leg in decision.legs] == [("BTCUSDC", 2.0), ("BTCUSDT", 0.5)]
+    assert decision.unrouted == 0
+
+
+def test_quantity_beyond_visible_depth_is_not_priced(make_bot):
+    decision = SmartOrderRouter(make_bot(FakeClient(), EXCHANGE_INFO)).plan("BTC", "BUY", 5)
+    assert decision.unrouted == pytest.approx(2)
+    assert decision.routed_quantity == pytest.approx(3)
+    # every leg is priced from levels that exist
+    assert {leg.symbol: leg.price for leg in decision.legs} == {"BTCUSDC": 49900.0, "BTCUSDT": 50000.0}
+    assert decision.best_single is None
+    assert "not routed" in decision.summary()
+
+
+def test_buy_legs_are_limited_to_free_quote_balances(make_bot):
+    # no USDC held: the cheaper BTCUSDC book cannot be used without a conversion order
+    decision = SmartOrderRouter(make_bot(FakeClient(USDT=30_000), EXCHANGE_INFO)).plan("BTC", "BUY", 2.5)
+    assert [leg.symbol for leg in decision.legs] == ["BTCUSDT"]
+    leg = decision.legs[0]
+    assert leg.quantity * leg.price * (1 + leg.fee_rate) <= 30_000
+    assert decision.unrouted == pytest.approx(2.5 - leg.quantity)
+
+
+def test_sell_is_limited_to_free_base_balance(make_bot):
+    decision = SmartOrderRouter(make_bot(FakeClient(BTC=1.2), EXCHANGE_INFO)).plan("BTC", "SELL", 2)
+    assert decision.routed_quantity == pytest.approx(1.2)
+    assert decision.unrouted == pytest.approx(0.8)
+
+
+def test_best_book_leg_below_minimums_is_dropped(make_bot):
+    # 0.0001 BTC is below BTCUSDT's minQty, and there is no other book to fold it into
+    decision = SmartOrderRouter(make_bot(FakeClient(USDT=1_000_000), EXCHANGE_INFO)).plan("BTC", "BUY", 0.0001)
+    assert decision.legs == []
+    assert decision.unrouted == pytest.approx(0.0001)
@@ -0,0 +1,65 @@
+import time
+from types import SimpleNamespace
+
+from order_book import DepthBookManager
+from strategy_runtime import Strategy, StrategyRuntime
+
+
+class FakeBot:
+    def __init__(self, order_books=None):
+        self.order_books = order_books
+        self.market_data = None
+
+    def add_order_listener(self, callback):
+        pass
+
+
+class Recorder(Strategy):
+    symbols = ("BTCUSDT",)
+
+    def __init__(self):
+        super().__init__()
+        self.ticks = []
+
+    def on_tick(self, tick):
+        self.ticks.append(tick)
+
+
+def synced_manager():
+    books = DepthBookManager(SimpleNamespace(), ["BTCUSDT"])
+    books.books["BTCUSDT"].apply_snapshot({'lastUpdateId': 10, 'bids': [["99", "1"]], 'asks': [["101", "2"]]})
+    books._buffers["BTCUSDT"] = None
+    return books
+
+
+def test_depth_updates_are_pushed_with_receipt_time():
+    books = synced_manager()
+    seen = []
+    books.add_listener(lambda book, received_ns: seen.append((book.top(), received_ns)))
+    before = time.perf_counter_ns()
+    books._handle({'e': 'depthUpdate', 's': 'BTCUSDT', 'U': 11, 'u': 11, 'b': [["100", "3"]], 'a': []})
+    assert seen[0][0] == (100.0, 3.0, 101.0, 2.0)
+    assert before <= seen[0][1] <= time.perf_counter_ns()
+
+    # a gap triggers a resync and no listener call
+    books._request_resync = lambda symbol: None
+    books._handle({'e': 'depthUpdate', 's': 'BTCUSDT', 'U': 20, 'u': 20, 'b': [], 'a': []})
+    assert len(seen) == 1
+
+
+def test_runtime_receives_book_ticks_without_polling():
+    books = synced_manager()
+    runtime = StrategyRuntime(FakeBot(books))
+    strategy = runtime.register(Recorder())
+    runtime.start()
+    try:
+        assert [t.name for t in runtime._threads] == ["strategy-timers"]
+        books._handle({'e': 'depthUpdate', 's': 'BTCUSDT', 'U': 11, 'u': 11, 'b': [["100", "3"]], 'a': []})
+        deadline = time.monotonic() + 2
+        while not strategy.ticks and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        runtime.stop()
+    assert strategy.ticks[0].bid == 100.0 and strategy.ticks[0].ask_qty == 2.0
+    assert runtime.stats()["Recorder"]["tick_delay"]["calls"] == 1
+    assert books._listeners == []
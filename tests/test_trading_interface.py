@@ -0,0 +1,30 @@
+import builtins
+import re
+
+import pytest
+
+import trading_interface
+from trading_interface import EXIT_CHOICE, MENU_ACTIONS, TradingInterface
+
+
+def test_every_menu_choice_maps_to_a_method(capsys):
+    for choice, name in MENU_ACTIONS.items():
+        assert callable(getattr(TradingInterface, name, None)), f"menu choice {choice} -> missing {name}"
+
+    # and every option shown in the header is either an action or exit
+    TradingInterface._display_header(None)
+    shown = set(re.findall(r"│ (\d+)\. ", capsys.readouterr().out))
+    assert shown == set(MENU_ACTIONS) | {EXIT_CHOICE}
+
+
+def test_run_dispatches_each_choice(monkeypatch):
+    called = []
+    for name in MENU_ACTIONS.values():
+        monkeypatch.setattr(TradingInterface, name, lambda self, name=name: called.append(name))
+    inputs = iter([c for choice in MENU_ACTIONS for c in (choice, "")] + [EXIT_CHOICE])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(inputs))
+    monkeypatch.setattr(trading_interface.logger, "error", lambda msg: pytest.fail(msg))
+
+    interface = TradingInterface.__new__(TradingInterface)
+    interface.run()
+    assert called == list(MENU_ACTIONS.values())